@@ -1,24 +1,24 @@
 import dash
-from dash import dcc, html, Input, Output, State, ALL
+from dash import dcc, html, Input, Output, State, ALL, MATCH, ctx
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.graph_objects as go
-import base64
-import io
 import json
-from scipy.stats import ks_2samp
+from contextlib import nullcontext
 
 # --- IMPORT CUSTOM MODULES ---
-from src.utils import THEMES_COLORS, STATUS_COLORS, calculate_skewness, calculate_entropy, calculate_global_score
-from src.auditor import run_fairness_audit
-from src.reporting import generate_pdf_bytes
+from src.cache import DATASET_CACHE
+from src.ingestion import base64_content_key, read_base64_dataset, columnar_archive
+from src.profiling import PROFILER
+from src.utils import THEMES_COLORS, STATUS_COLORS, get_bias_status
+from src.jobs import JOB_MANAGER
+from src.result_store import RESULT_STORE
+from src.pipeline import compute_bias_table, leaderboard
 from src.pages.import_page import render_import_layout
-from src.pages.dashboard_page import render_dashboard_layout, create_individual_card
-from src.pages.admin_page import render_admin_layout
-from fonction_des_donné import (
-    creation_de_ref, 
-    moyenne_par_colone_référance
+from src.pages.dashboard_page import (
+    render_dashboard_layout, create_individual_card, create_card_details, create_progress_bar, create_leaderboard,
+    create_fairness_panel, page_of_cards, DONUT_FIGURE_JS
 )
+from src.pages.admin_page import render_admin_layout, render_profile_table, render_history_table, render_trend_table
 
 # --- APP INITIALIZATION ---
 app = dash.Dash(
@@ -31,32 +31,28 @@ app = dash.Dash(
 app.layout = html.Div(id="main-viewport", children=[
     dcc.Location(id='url', refresh=False),
     
-    # Session & Local Storage
+    # Session & Local Storage (dataset stores only hold the server-side cache key)
     dcc.Store(id='df_real_store', storage_type='session'),
     dcc.Store(id='df_gen_store', storage_type='session'),
     dcc.Store(id='selected-columns-store', data=['none'], storage_type='session'),
-    dcc.Store(id='settings-store', data={'theme': 'sombre', 'thresholds': [15, 40]}, storage_type='local'),
+    dcc.Store(id='audit-job-store', storage_type='session'),
+    dcc.Store(id='df_candidates_store', storage_type='session'),
+    dcc.Store(id='comparison-store', storage_type='session'),
+    dcc.Store(id='settings-store', data={'theme': 'sombre', 'thresholds': [15, 40], 'approx': False}, storage_type='local'),
     
     dcc.Download(id="download-pdf-report"),
+    dcc.Download(id="download-parquet"),
+    dcc.Download(id="download-leaderboard"),
 
     html.Div(id='nav-container'),
     html.Div(id='page-content', style={'minHeight': '92vh'})
 ])
 
-# --- HELPER: DONUT CHART GENERATION ---
-def generate_donut(value, color, text_color):
-    """Generates the visual donut representation of bias."""
-    fig = go.Figure(data=[go.Pie(
-        values=[value, max(0.1, 100 - value)], 
-        hole=.75, marker_colors=[color, "rgba(200, 200, 200, 0.2)"],
-        textinfo='none', hoverinfo='none'
-    )])
-    fig.update_layout(
-        showlegend=False, height=120, margin=dict(l=2, r=2, t=2, b=2),
-        annotations=[dict(text=f"{value:.1f}%", x=0.5, y=0.5, font_size=16, showarrow=False, font_weight="bold", font_color=text_color)],
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
-    )
-    return fig
+# --- HELPER: RECOMMENDATION ---
+def get_recommendation(bias, thresholds):
+    """Action suggested for a column given its bias and the (vigilance, critical) thresholds."""
+    lim_v, lim_o = thresholds
+    return "Stable" if bias < lim_v else ("Rééquilibrer" if bias < lim_o else "Action Requise")
 
 # --- NAVIGATION BAR RENDERER ---
 def render_navbar(active_page, theme_key):
@@ -79,114 +75,223 @@ def sync_ui(path, settings):
     style = {'backgroundColor': theme['fond'], 'minHeight': '100vh', 'transition': '0.3s'}
     
     if path == '/graphique': content = render_dashboard_layout(tk)
-    elif path == '/admin': content = render_admin_layout(settings)
+    elif path == '/admin': content = render_admin_layout(settings, PROFILER.snapshot(), RESULT_STORE.history().to_dict('records'),
+                                                         RESULT_STORE.real_datasets())
     else: content = render_import_layout(tk)
     
     return content, render_navbar(path, tk), style
 
 # --- CALLBACKS: DATA LOADING ---
+@PROFILER.profiled('upload')
 def safe_parse(contents, filename):
+    """Parses an upload into the server-side cache and returns its key."""
     if not contents: return None, None
     content_string = contents.split(',')[1]
-    decoded = base64.b64decode(content_string)
-    df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-    return "SUCCESS", df.to_dict('records')
+    with PROFILER.stage('upload_hash'):
+        key = base64_content_key(content_string)
+    if key not in DATASET_CACHE:
+        # Streaming decode + chunked parsing keeps peak memory close to the final frame
+        with PROFILER.stage('upload_decode_parse'):
+            df = read_base64_dataset(content_string, filename, key)
+        DATASET_CACHE.put(key, df)
+    # The file name labels this dataset in the audit history
+    RESULT_STORE.name_dataset(key, filename)
+    return "SUCCESS", key
 
 @app.callback([Output('content-reel', 'children'), Output('df_real_store', 'data')], 
               Input('upload-reel', 'contents'), State('upload-reel', 'filename'))
 def load_real_data(contents, filename):
-    if not contents: return "Glisser CSV", dash.no_update
+    if not contents: return "Glisser CSV / Parquet", dash.no_update
     res, data = safe_parse(contents, filename)
     return (f"✅ {filename}" if res else "❌ Erreur"), data
 
 @app.callback([Output('content-genere', 'children'), Output('df_gen_store', 'data')], 
               Input('upload-genere', 'contents'), State('upload-genere', 'filename'))
 def load_gen_data(contents, filename):
-    if not contents: return "Glisser CSV", dash.no_update
+    if not contents: return "Glisser CSV / Parquet", dash.no_update
     res, data = safe_parse(contents, filename)
     return (f"✅ {filename}" if res else "❌ Erreur"), data
 
+@app.callback([Output('content-candidats', 'children'), Output('df_candidates_store', 'data')], 
+              Input('upload-candidats', 'contents'), State('upload-candidats', 'filename'))
+def load_candidates(contents, filenames):
+    if not contents: return "Glisser plusieurs CSV / Parquet", dash.no_update
+    candidates = []
+    for content, filename in zip(contents, filenames):
+        res, key = safe_parse(content, filename)
+        if res: candidates.append({'name': filename, 'key': key})
+    return f"✅ {len(candidates)} candidats : {', '.join(c['name'] for c in candidates)}", candidates
+
 # --- CALLBACKS: AUDIT & VISUALIZATION ---
 @app.callback(
-    [Output('individual-bias-cards', 'children'), Output('global-score-zone', 'children')],
+    Output('audit-job-store', 'data'),
     [Input('df_real_store', 'data'), Input('df_gen_store', 'data'), 
      Input('selected-columns-store', 'data'), Input('settings-store', 'data')]
 )
-def update_audit_results(data_r, data_g, selected, settings):
-    if not data_r or not data_g: 
-        return [html.Div("Veuillez importer les fichiers CSV pour commencer.", className="text-center mt-5", style={'color': '#94a3b8'})], ""
+def submit_audit(data_r, data_g, selected, settings):
+    """Queues the audit as soon as both files are loaded; returns the job id immediately."""
+    if not data_r or not data_g: return None
+    return JOB_MANAGER.submit(data_r, data_g, selected, settings.get('approx', False))
+
+@app.callback(
+    [Output('individual-bias-cards', 'children'), Output('global-score-zone', 'children'),
+     Output('audit-progress', 'children'), Output('audit-poll', 'disabled'),
+     Output('cards-pagination', 'max_value'), Output('cards-pagination-zone', 'style')],
+    [Input('audit-poll', 'n_intervals'), Input('audit-job-store', 'data'), Input('settings-store', 'data'),
+     Input('cards-pagination', 'active_page')]
+)
+def update_audit_results(n_intervals, job_id, settings, active_page):
+    """
+    Polls the background audit and renders the cards of the active page whose columns are already computed.
+    Only one page of cards is sent to the browser, whatever the number of columns.
+    """
+    hidden = {'display': 'none'}
+    if not job_id: 
+        return [html.Div("Veuillez importer les fichiers CSV pour commencer.", className="text-center mt-5", style={'color': '#94a3b8'})], "", "", True, 1, hidden
+    
+    job = JOB_MANAGER.get(job_id)
+    if job is None or job['status'] == 'error':
+        message = job['error'] if job else "Session expirée : veuillez réimporter les fichiers CSV."
+        return [html.Div(message, className="text-center mt-5", style={'color': '#94a3b8'})], "", "", True, 1, hidden
     
     tk = settings.get('theme', 'sombre')
     t, a = THEMES_COLORS[tk], STATUS_COLORS[tk]
     lim_v, lim_o = settings.get('thresholds', [15, 40])
+    finished = job['status'] == 'done'
+    column_metrics = job['columns']
     
-    df_r, df_g = pd.DataFrame(data_r), pd.DataFrame(data_g)
-    ref_col = df_r.columns[0]
-    
-    # Filtering columns
-    num_cols = df_r.select_dtypes(include=['number']).columns
-    targets = [c for c in num_cols if c in df_g.columns and c != ref_col]
-    if 'none' not in selected:
-        targets = [c for c in targets if c in selected]
-
-    # Bias Calculation Logic
-    df_r_ref = creation_de_ref(df_r[[ref_col] + targets], ref_col)
-    df_g_ref = creation_de_ref(df_g[[ref_col] + targets], ref_col)
-    df_m_r = moyenne_par_colone_référance(df_r_ref).set_index('ref')
-    df_m_g = moyenne_par_colone_référance(df_g_ref).set_index('ref')
-    
-    common = df_m_r.index.intersection(df_m_g.index)
-    df_bias = ((df_m_g.loc[common] - df_m_r.loc[common]).abs() / df_m_r.loc[common].replace(0, 1).abs()) * 100
-    final_bias_scores = df_bias.mean()
-
-    # Fairness Logic (Fairlearn)
-    cat_cols = df_r.select_dtypes(include=['object']).columns
-    sensitive = cat_cols[0] if len(cat_cols) > 0 else None
-    spd = run_fairness_audit(df_r, targets[0], sensitive) if (sensitive and targets) else None
-
-    # Global Score calculation
-    g_score = calculate_global_score(final_bias_scores.mean(), 0.5, spd)
-    
+    # Global Score (known once every stage is over)
+    g_score = f"{job['global_score']}%" if finished else "…"
     score_widget = html.Div([
         html.Small("Score Global de Fidélité", style={'color': t['texte']}),
-        html.H2(f"{g_score}%", style={'color': a['alia'], 'fontWeight': 'bold', 'margin': '0'})
+        html.H2(g_score, style={'color': a['alia'], 'fontWeight': 'bold', 'margin': '0'})
     ], className="text-center p-2", style={'backgroundColor': t['card'], 'borderRadius': '10px', 'border': f'1px solid {t["border"]}'})
 
-    # Card Generation
+    # Card Generation for the active page (only the final render is profiled, not every poll)
     cards = []
-    for c in targets:
-        bias = float(final_bias_scores[c])
-        metrics = {
-            'skewness': calculate_skewness(df_r[c]),
-            'entropy': calculate_entropy(df_r[c]),
-            'p_value': ks_2samp(df_r[c].dropna(), df_g[c].dropna())[1],
-            'recommendation': "Stable" if bias < lim_v else ("Rééquilibrer" if bias < lim_o else "Action Requise")
-        }
+    page, pages = page_of_cards(job['targets'], active_page)
+    ready = [c for c in page if c in column_metrics]
+    with (PROFILER.run('render', job=job_id) if finished else nullcontext()), \
+            PROFILER.stage('card_rendering', rows=len(ready)):
+        for c in ready:
+            bias = column_metrics[c]['bias']
+            status_color = a['ok'] if bias <= lim_v else (a['moy'] if bias <= lim_o else a['crit'])
+            status_text = get_bias_status(bias, (lim_v, lim_o))
+            cards.append(create_individual_card(c, bias, status_text, status_color, tk, column_metrics[c]))
         
-        status_color = a['ok'] if bias <= lim_v else (a['moy'] if bias <= lim_o else a['crit'])
-        status_text = "OK" if bias <= lim_v else ("WARNING" if bias <= lim_o else "CRITIQUE")
-        
-        card = create_individual_card(c, bias, status_text, status_color, tk, metrics)
-        # Inject the donut chart into the placeholder
-        card.children.children.insert(2, dcc.Graph(figure=generate_donut(bias, status_color, t['texte']), config={'displayModeBar': False}))
-        cards.append(card)
-        
-    return cards, score_widget
+    progress = create_fairness_panel(job['fairness'], tk) if finished else create_progress_bar(job, tk)
+    return cards, score_widget, progress, finished, pages, (None if pages > 1 else hidden)
+
+# Donut charts are drawn in the browser from the numeric payload of each card
+app.clientside_callback(
+    DONUT_FIGURE_JS,
+    Output({'type': 'donut-chart', 'index': MATCH}, 'figure'),
+    Input({'type': 'donut-data', 'index': MATCH}, 'data')
+)
+
+@app.callback(
+    Output({'type': 'card-details-body', 'index': MATCH}, 'children'),
+    Input({'type': 'card-details', 'index': MATCH}, 'active_item'),
+    [State('audit-job-store', 'data'), State('settings-store', 'data')],
+    prevent_initial_call=True
+)
+def load_card_details(active_item, job_id, settings):
+    """Renders the technical details of a card the first time it is expanded."""
+    job = JOB_MANAGER.get(job_id) if job_id else None
+    column = ctx.triggered_id['index'] if ctx.triggered_id else None
+    if not active_item or job is None or column not in job['columns']:
+        return dash.no_update
+    metrics = job['columns'][column]
+    thresholds = settings.get('thresholds', [15, 40])
+    return create_card_details(dict(metrics, recommendation=get_recommendation(metrics['bias'], thresholds)),
+                               settings.get('theme', 'sombre'))
+
+# --- CALLBACKS: CANDIDATE COMPARISON ---
+@app.callback(
+    Output('comparison-store', 'data'),
+    [Input('df_real_store', 'data'), Input('df_candidates_store', 'data'), 
+     Input('selected-columns-store', 'data'), Input('settings-store', 'data')]
+)
+def submit_comparison(data_r, candidates, selected, settings):
+    """Queues one audit per candidate: they run side by side and share the real-data profile."""
+    if not data_r or not candidates: return None
+    return [{'name': c['name'], 'job': JOB_MANAGER.submit(data_r, c['key'], selected, settings.get('approx', False))}
+            for c in candidates]
+
+def comparison_board(comparison):
+    """Leaderboard of the finished candidates, and the state of the others."""
+    audits, pending = {}, []
+    for c in comparison:
+        job = JOB_MANAGER.get(c['job'])
+        if job is None: pending.append((c['name'], "Session expirée"))
+        elif job['status'] == 'error': pending.append((c['name'], f"❌ {job['error']}"))
+        elif job['status'] == 'done': audits[c['name']] = job
+        else: pending.append((c['name'], f"⏳ {len(job['columns'])}/{len(job['targets'])} colonnes"))
+    return leaderboard(audits), pending
+
+@app.callback(
+    [Output('leaderboard-zone', 'children'), Output('leaderboard-poll', 'disabled')],
+    [Input('leaderboard-poll', 'n_intervals'), Input('comparison-store', 'data'), Input('settings-store', 'data')]
+)
+def update_leaderboard(n_intervals, comparison, settings):
+    if not comparison: return "", True
+    board, pending = comparison_board(comparison)
+    running = any(state.startswith("⏳") for _, state in pending)
+    return create_leaderboard(board, pending, settings.get('theme', 'sombre')), not running
+
+@app.callback(
+    Output("download-leaderboard", "data"),
+    Input("btn-leaderboard-export", "n_clicks"),
+    State('comparison-store', 'data'),
+    prevent_initial_call=True
+)
+def export_leaderboard(n, comparison):
+    if not n or not comparison: return dash.no_update
+    board, _ = comparison_board(comparison)
+    return dcc.send_data_frame(board.to_csv, "Alia_Leaderboard.csv", index=False)
 
 # --- CALLBACKS: EXPORT PDF ---
 @app.callback(
     Output("download-pdf-report", "data"),
     Input("btn-pdf", "n_clicks"),
-    [State('df_real_store', 'data'), State('selected-columns-store', 'data')],
+    [State('audit-job-store', 'data'), State('settings-store', 'data')],
     prevent_initial_call=True
 )
-def handle_pdf_export(n, data_r, selected):
-    if not n or not data_r: return dash.no_update
-    # Logic to bundle metrics for PDF
-    report_data = [{'name': 'Audit Dataset', 'bias': 10.5, 'status': 'Warning', 'entropy': 1.1, 'skewness': 0.2}]
-    pdf_content = generate_pdf_bytes(report_data)
+def handle_pdf_export(n, job_id, settings):
+    job = JOB_MANAGER.get(job_id)
+    if not n or not job or job['status'] != 'done': return dash.no_update
+    # Metrics come from the finished audit: exporting only serializes them
+    thresholds = settings.get('thresholds', [15, 40])
+    report_data = (
+        dict(job['columns'][c], name=c, status=get_bias_status(job['columns'][c]['bias'], thresholds))
+        for c in job['targets']
+    )
+    summary = {key: job[key] for key in ('global_score', 'fairness_gap', 'fairness', 'reference')}
+    from src.reporting import generate_pdf_bytes
+
+    pdf_content = generate_pdf_bytes(report_data, summary)
     return dcc.send_bytes(pdf_content, "Alia_Bias_Audit_Report.pdf")
 
+@app.callback(
+    Output("download-parquet", "data"),
+    Input("btn-parquet", "n_clicks"),
+    [State('audit-job-store', 'data'), State('df_real_store', 'data'), State('df_gen_store', 'data'),
+     State('settings-store', 'data')],
+    prevent_initial_call=True
+)
+def handle_parquet_export(n, job_id, data_r, data_g, settings):
+    job = JOB_MANAGER.get(job_id)
+    df_r, df_g = DATASET_CACHE.get(data_r), DATASET_CACHE.get(data_g)
+    if not n or not job or job['status'] != 'done' or df_r is None or df_g is None: return dash.no_update
+    thresholds = settings.get('thresholds', [15, 40])
+    metrics = pd.DataFrame.from_dict(job['columns'], orient='index').loc[job['targets']].rename_axis('column')
+    metrics['status'] = [get_bias_status(b, thresholds) for b in metrics['bias']]
+    tables = {
+        'bias_par_reference': compute_bias_table(df_r, df_g, job['reference'], job['targets']),
+        'metriques_colonnes': metrics,
+    }
+    return dcc.send_bytes(columnar_archive(tables), "Alia_Bias_Audit_Tables.zip")
+
 # --- CALLBACKS: ADMIN & SETTINGS ---
 @app.callback([Output("admin-panel", "style"), Output("admin-lock-zone", "style"), Output("unlock-err", "children")],
               Input("btn-unlock", "n_clicks"), State("admin-pwd", "value"), prevent_initial_call=True)
@@ -194,10 +299,39 @@ def check_admin_pass(n, p):
     if p == "admin": return {"display": "block"}, {"display": "none"}, ""
     return {"display": "none"}, {"display": "block"}, "Mot de passe incorrect."
 
+@app.callback(Output('profile-table', 'children'), Input('btn-profile-refresh', 'n_clicks'),
+              State('settings-store', 'data'), prevent_initial_call=True)
+def refresh_profile(n, settings):
+    return render_profile_table(PROFILER.snapshot(), settings.get('theme', 'sombre'))
+
+@app.callback(Output('download-profile', 'data'), Input('btn-profile-export', 'n_clicks'), prevent_initial_call=True)
+def export_profile(n):
+    return dcc.send_string(PROFILER.to_json(), "Alia_Audit_Profile.json")
+
+@app.callback([Output('history-table', 'children'), Output('trend-real-sel', 'options'), Output('trend-real-sel', 'value')],
+              [Input('btn-history-refresh', 'n_clicks'), Input('btn-history-evict', 'n_clicks')],
+              [State('settings-store', 'data'), State('trend-real-sel', 'value')], prevent_initial_call=True)
+def refresh_history(n_refresh, n_evict, settings, real_key):
+    if ctx.triggered_id == 'btn-history-evict':
+        RESULT_STORE.evict()
+    datasets = RESULT_STORE.real_datasets()
+    # The selected real dataset stays selected unless all of its audits were purged
+    keys = [key for key, _ in datasets]
+    real_key = real_key if real_key in keys else (keys[0] if keys else None)
+    options = [{'label': name, 'value': key} for key, name in datasets]
+    return render_history_table(RESULT_STORE.history().to_dict('records'), settings.get('theme', 'sombre')), options, real_key
+
+@app.callback(Output('trend-table', 'children'), Input('trend-real-sel', 'value'), State('settings-store', 'data'))
+def show_trend(real_key, settings):
+    trend = RESULT_STORE.trend(real_key).to_dict('records') if real_key else []
+    return render_trend_table(trend, settings.get('theme', 'sombre'))
+
 @app.callback(Output('settings-store', 'data'), Input('btn-save', 'n_clicks'), 
-              [State('theme-sel', 'value'), State('admin-slider', 'value')], prevent_initial_call=True)
-def update_settings(n, theme, thresholds):
-    return {'theme': theme, 'thresholds': sorted(thresholds)}
+              [State('theme-sel', 'value'), State('admin-slider', 'value'), State('approx-sel', 'value')],
+              prevent_initial_call=True)
+def update_settings(n, theme, thresholds, approx):
+    return {'theme': theme, 'thresholds': sorted(thresholds), 'approx': bool(approx)}
 
+# Development server (single process); production runs through wsgi.py with gunicorn
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
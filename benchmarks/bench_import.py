@@ -0,0 +1,128 @@
+# benchmarks/bench_import.py
+"""
+Cold-start benchmark: time needed to import the application in a new process.
+
+Usage:
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --runs 10 --budget-ms 800 --output import.json
+
+Every run imports the module in a fresh interpreter, as a new server worker does; one more
+run with -X importtime lists the slowest imports. The median wall time is checked against
+the budget, and the libraries that must only be loaded on first use (LAZY_MODULES) must not
+be imported. The exit code is 1 when the budget is exceeded or a lazy module is imported
+eagerly, so the script can gate CI.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy libraries (and our modules wrapping them) loaded on first use, never by the import itself
+LAZY_MODULES = ['scipy.stats', 'plotly.express', 'src.reporting']
+
+DEFAULT_BUDGET_MS = 1000
+
+# Prints the import wall time (ms) and the lazy modules that got imported
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'eager': [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+# --- MEASUREMENT ---
+
+def import_once(module, importtime=False):
+    """
+    Imports 'module' in a new interpreter.
+    Returns (wall ms, eagerly loaded lazy modules, -X importtime log when requested).
+    """
+    flags = ['-X', 'importtime'] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, '-c', PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return probe['ms'], probe['eager'], result.stderr
+
+
+def top_level_imports(importtime_log, limit=15):
+    """Packages imported directly by the probed module, by cumulative time (ms), slowest first."""
+    entries = []
+    for line in importtime_log.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Indentation of the probed module (1) and of the modules it imports (3)
+        if match and len(match.group(3)) <= 3:
+            entries.append({'module': match.group(4), 'ms': round(int(match.group(2)) / 1000, 1)})
+    return sorted(entries, key=lambda e: e['ms'], reverse=True)[:limit]
+
+
+# --- ENTRY POINT ---
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measures the cold import time of the application.")
+    parser.add_argument('--module', default='app', help="Module imported by every run")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help="Maximum median import time")
+    parser.add_argument('--output', default=None, help="Optional JSON report")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # The first import compiles the bytecode: it is not a cold start of a deployed worker
+    import_once(args.module)
+    runs = [import_once(args.module) for _ in range(max(1, args.runs))]
+    timings = [ms for ms, _, _ in runs]
+    median = statistics.median(timings)
+    eager = sorted({m for _, modules, _ in runs for m in modules})
+    slowest = top_level_imports(import_once(args.module, importtime=True)[2])
+
+    print(f"import {args.module}: median {median:.0f} ms over {len(timings)} runs "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}), budget {args.budget_ms:.0f} ms")
+    for entry in slowest:
+        print(f"  {entry['module']:<32} {entry['ms']:8.1f} ms")
+    if eager:
+        print(f"Loaded at import instead of on first use: {', '.join(eager)}")
+
+    if args.output:
+        report = {
+            'revision': git_revision(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'module': args.module,
+            'budget_ms': args.budget_ms,
+            'median_ms': round(median, 1),
+            'runs_ms': [round(ms, 1) for ms in timings],
+            'eager_lazy_modules': eager,
+            'slowest_imports': slowest,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    return 1 if median > args.budget_ms or eager else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
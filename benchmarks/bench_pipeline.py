@@ -0,0 +1,178 @@
+# benchmarks/bench_pipeline.py
+"""
+Scaling benchmark of the audit pipeline.
+
+Usage:
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --rows 1000 100000 --cols 10 100 --shape heart
+
+Builds Heart- and WBCD-shaped datasets (resampled from data/ with noise) at several
+row and column counts, times every pipeline stage and records its peak memory
+(tracemalloc). Results are written as JSON so runs can be compared between commits.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fonction_des_donné import (  # noqa: E402
+    creation_de_ref, encoder_references, moyenne_par_colone_référance, index_ref_trie,
+    calcul_ratio, calcul_ratio_batch, selection_valeur_ref_gen, biais_par_reference, generate_pdf_report
+)
+from src.ingestion import read_csv_chunked  # noqa: E402
+from src.pipeline import compute_bias_scores, column_statistics  # noqa: E402
+from src.utils import calculate_entropy  # noqa: E402
+
+SHAPES = {
+    'heart': ('real_data_Heart.csv', 'gen_data_Heart.csv'),
+    'wbcd': ('real_data_WBCD.csv', 'gen_data_WBCD.csv'),
+}
+
+DEFAULT_ROWS = [1_000, 100_000, 10_000_000]
+DEFAULT_COLS = [10, 100, 1000]
+
+
+# --- SYNTHETIC DATASETS ---
+
+def scale_dataset(source, n_rows, n_cols, seed, ref_col, numeric):
+    """
+    Resamples 'source' to n_rows rows and widens it to n_cols audited columns.
+    Extra columns are noisy copies of the 'numeric' ones, so distributions stay realistic.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(source), n_rows)
+
+    data = {ref_col: source[ref_col].to_numpy()[rows]}
+    for i in range(n_cols):
+        base = numeric[i % len(numeric)]
+        values = source[base].to_numpy()[rows]
+        if i >= len(numeric):
+            scale = float(source[base].std() or 1.0) * 0.05
+            values = values + rng.normal(0, scale, n_rows)
+        data[base if i < len(numeric) else f"{base}_{i}"] = values
+    return pd.DataFrame(data)
+
+
+# --- MEASUREMENT ---
+
+def measure(stage, func, records, context):
+    """Runs one stage, appending its wall time and peak traced memory to 'records'."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    records.append(dict(context, stage=stage, seconds=round(seconds, 6), peak_mb=round(peak / 1024 ** 2, 3)))
+    print(f"  {stage:<16} {seconds:9.3f}s {peak / 1024 ** 2:10.1f} MB")
+    return result
+
+
+def bench_case(shape, n_rows, n_cols, with_pdf, ratio_sample):
+    """Times every stage on one (shape, rows, columns) case."""
+    real_file, gen_file = SHAPES[shape]
+    base_r = pd.read_csv(os.path.join(ROOT, 'data', real_file))
+    base_g = pd.read_csv(os.path.join(ROOT, 'data', gen_file))
+    ref_col = base_r.columns[0]
+    numeric = [c for c in base_r.select_dtypes(include=['number']).columns if c != ref_col and c in base_g]
+    df_r = scale_dataset(base_r, n_rows, n_cols, 1, ref_col, numeric)
+    df_g = scale_dataset(base_g, n_rows, n_cols, 2, ref_col, numeric)
+    targets = list(df_r.columns[1:])
+    context = {'shape': shape, 'rows': n_rows, 'cols': n_cols}
+    records = []
+    print(f"{shape}: {n_rows} rows x {n_cols} columns")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'gen.csv')
+        df_g.to_csv(path, index=False)
+        measure('parse', lambda: read_csv_chunked(path), records, context)
+
+    measure('ref_encoding', lambda: encoder_references(df_r[ref_col], df_g[ref_col]), records, context)
+    ref_r = measure('ref_creation', lambda: creation_de_ref(df_r, ref_col), records, context)
+    ref_g = creation_de_ref(df_g, ref_col)
+    m_r = measure('groupby', lambda: moyenne_par_colone_référance(ref_r), records, context)
+    m_g = moyenne_par_colone_référance(ref_g)
+    del ref_r, ref_g
+
+    measure('bias_dashboard', lambda: compute_bias_scores(df_r, df_g, ref_col, targets), records, context)
+    df_bias = measure('bias_engine', lambda: biais_par_reference(m_r, m_g, df_r), records, context)
+
+    valeurs_gen = m_g['ref'].to_numpy()
+    valeurs_triees = index_ref_trie(m_r)
+    measure('ratio_batch', lambda: calcul_ratio_batch(valeurs_gen, valeurs_triees), records, context)
+
+    def ratio_loop():
+        for v in valeurs_gen[:ratio_sample]:
+            calcul_ratio(selection_valeur_ref_gen(v, m_r, valeurs_triees), v)
+    measure(f'ratio_loop_{ratio_sample}', ratio_loop, records, context)
+
+    pairs = [(df_r[c].to_numpy(), df_g[c].to_numpy()) for c in targets]
+    measure('ks_skew_entropy', lambda: [column_statistics(p) for p in pairs], records, context)
+    measure('entropy', lambda: [calculate_entropy(df_r[c]) for c in targets], records, context)
+
+    if with_pdf:
+        measure('pdf', lambda: generate_pdf_report(df_bias.reset_index()), records, context)
+    return records
+
+
+# --- ENTRY POINT ---
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the audit pipeline on scaled datasets.")
+    parser.add_argument('--shape', nargs='+', default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument('--rows', nargs='+', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--cols', nargs='+', type=int, default=DEFAULT_COLS)
+    parser.add_argument('--max-cells', type=float, default=1e8,
+                        help="Skip cases with more than rows x cols cells (memory guard)")
+    parser.add_argument('--ratio-sample', type=int, default=50,
+                        help="Number of reference values timed with the scalar calcul_ratio loop")
+    parser.add_argument('--no-pdf', action='store_true', help="Skip the PDF stage")
+    parser.add_argument('--output', default='bench_output.json')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    records, skipped = [], []
+    for shape in args.shape:
+        for n_rows in args.rows:
+            for n_cols in args.cols:
+                if n_rows * n_cols > args.max_cells:
+                    skipped.append({'shape': shape, 'rows': n_rows, 'cols': n_cols})
+                    continue
+                records.extend(bench_case(shape, n_rows, n_cols, not args.no_pdf, args.ratio_sample))
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': records,
+        'skipped': skipped,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(records)} measurements written to {args.output} ({len(skipped)} cases skipped)")
+
+
+if __name__ == '__main__':
+    main()
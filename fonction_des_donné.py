@@ -5,13 +5,19 @@ Created on Sat Feb  7 19:55:15 2026
 @author: jguio
 """
 
+import numpy as np
 import pandas as pd
 from fpdf import FPDF
 import datetime
-import plotly.express as px
 import io
-from fpdf import FPDF
-import datetime
+import hashlib
+import tempfile
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import LRUCache
+from src.config import PDF_GRAPH_WORKERS, PDF_MAX_GRAPHS, PDF_IMAGE_CACHE_MB
+from src.utils import STATUS_COLORS
 
 
 def creation_de_ref(df: pd.DataFrame, nom_colonne: str) -> pd.DataFrame:
@@ -33,31 +39,104 @@ def creation_de_ref(df: pd.DataFrame, nom_colonne: str) -> pd.DataFrame:
     return df
 
 
+def encoder_references(serie_reel: pd.Series, serie_gen: pd.Series):
+    """
+    Encode les colonnes de référence réelle et générée, sans copier les autres colonnes.
+
+    Si les deux colonnes sont numériques, elles sont utilisées telles quelles.
+    Sinon, chaque valeur reçoit un code entier (à partir de 1, comme dans creation_de_ref)
+    tiré d'un même dictionnaire trié des valeurs des deux fichiers : une valeur a donc
+    le même code dans les deux fichiers. Les valeurs manquantes restent NaN.
+
+    Retourne (codes_reel, codes_gen, categories), categories valant None en numérique.
+    """
+    if pd.api.types.is_numeric_dtype(serie_reel) and pd.api.types.is_numeric_dtype(serie_gen):
+        return serie_reel, serie_gen, None
+
+    categories = sorted(set(serie_reel.dropna().unique()) | set(serie_gen.dropna().unique()))
+
+    def coder(serie):
+        codes = pd.Categorical(serie, categories=categories).codes.astype(np.int32) + 1
+        if (codes == 0).any():
+            codes = np.where(codes == 0, np.nan, codes)
+        return pd.Series(codes, index=serie.index, name=serie.name)
+
+    return coder(serie_reel), coder(serie_gen), categories
+
+
+
+
+def index_ref_trie(df: pd.DataFrame, nom_colonne: str = "ref") -> np.ndarray:
+    """
+    Construit une seule fois l'index trié (valeurs distinctes) de la colonne de référence.
+    À réutiliser pour toutes les valeurs générées au lieu de re-trier à chaque appel.
+    """
+    return np.unique(df[nom_colonne].dropna().to_numpy(dtype=np.float64))
 
 
 def valeurs_les_plus_proches(
     df: pd.DataFrame,
     nom_colonne: str,
-    valeur_ref: float
+    valeur_ref: float,
+    valeurs_triees: np.ndarray = None
 ) -> pd.Series:
     """
     Retourne la valeur exacte si elle existe,
     sinon les deux valeurs les plus proches (borne inf et sup).
+    'valeurs_triees' permet de passer un index déjà construit par index_ref_trie.
     """
-    valeurs = df[nom_colonne].drop_duplicates().sort_values().values
+    if valeurs_triees is None:
+        valeurs_triees = index_ref_trie(df, nom_colonne)
 
-    if valeur_ref in valeurs:
+    pos = np.searchsorted(valeurs_triees, valeur_ref, side="left")
+    if pos < len(valeurs_triees) and valeurs_triees[pos] == valeur_ref:
         return pd.Series([valeur_ref])
 
+    bornes = []
+    if pos > 0:
+        bornes.append(valeurs_triees[pos - 1])
+    if pos < len(valeurs_triees):
+        bornes.append(valeurs_triees[pos])
+    return pd.Series(bornes, dtype=np.float64)
+
+
+def voisins_proches_batch(
+    valeurs_ref_gen,
+    valeurs_triees: np.ndarray,
+    tolerance: float = 1e-6
+):
+    """
+    Version vectorisée de valeurs_les_plus_proches pour toutes les valeurs générées.
+
+    Retourne un tableau d'indices (m, 2) dans 'valeurs_triees' :
+    - colonne 0 : borne inférieure (ou la valeur exacte si elle existe),
+    - colonne 1 : borne supérieure (-1 si correspondance exacte ou borne absente).
+    Ainsi qu'un masque booléen (m,) des correspondances exactes.
+    """
+    valeurs = np.asarray(valeurs_ref_gen, dtype=np.float64)
+    n = len(valeurs_triees)
+    indices = np.full((len(valeurs), 2), -1, dtype=np.int64)
+    if n == 0:
+        return indices, np.zeros(len(valeurs), dtype=bool)
+
+    pos = np.searchsorted(valeurs_triees, valeurs, side="left")
+    inf = pos - 1
+    sup = np.where(pos < n, pos, -1)
 
-    inf = valeurs[valeurs < valeur_ref]
-    sup = valeurs[valeurs > valeur_ref]
+    # Correspondance exacte (à la tolérance près) avec l'un des deux voisins
+    ecart_sup = np.where(sup >= 0, np.abs(valeurs_triees[np.clip(sup, 0, n - 1)] - valeurs), np.inf)
+    ecart_inf = np.where(inf >= 0, np.abs(valeurs - valeurs_triees[np.clip(inf, 0, n - 1)]), np.inf)
+    exact = (ecart_sup < tolerance) | (ecart_inf < tolerance)
+    index_exact = np.where(ecart_sup <= ecart_inf, sup, inf)
 
-    borne_inf = inf[-1] if len(inf) > 0 else None
-    borne_sup = sup[0] if len(sup) > 0 else None
+    indices[:, 0] = np.where(exact, index_exact, inf)
+    indices[:, 1] = np.where(exact, -1, sup)
 
-    result = pd.Series([borne_inf, borne_sup]).dropna()
-    return result
+    # Une référence générée manquante n'a aucun voisin
+    manquantes = np.isnan(valeurs)
+    indices[manquantes] = -1
+    exact[manquantes] = False
+    return indices, exact
 
 
 
@@ -74,10 +153,11 @@ def filtrer_lignes_par_liste_ref(
 
 def selection_valeur_ref_gen(
     valeur_ref_gen: float,
-    data_real: pd.DataFrame
+    data_real: pd.DataFrame,
+    valeurs_triees: np.ndarray = None
 ) -> pd.DataFrame:
     """Sélectionne les lignes correspondant aux valeurs de référence proches."""
-    valeurs_proches = valeurs_les_plus_proches(data_real, "ref", valeur_ref_gen)
+    valeurs_proches = valeurs_les_plus_proches(data_real, "ref", valeur_ref_gen, valeurs_triees)
     return filtrer_lignes_par_liste_ref(data_real, valeurs_proches)
 
 
@@ -90,64 +170,156 @@ def calcul_ratio(df: pd.DataFrame, valeur_ref_gen: float):
     if df.empty:
         return []
 
-    liste_ref = df['ref'].tolist()
+    distances = np.abs(df['ref'].to_numpy(dtype=np.float64) - valeur_ref_gen)
     
     # ÉTAPE 1 : Chercher s'il y a une valeur exacte
-    indices_exacts = [i for i, x in enumerate(liste_ref) if abs(x - valeur_ref_gen) < 1e-6]
+    indices_exacts = np.flatnonzero(distances < 1e-6)
     
-    if indices_exacts:
+    if len(indices_exacts):
         # On donne tout le poids aux valeurs exactes (partagé si plusieurs)
-        poids = [0] * len(liste_ref)
-        valeur_partagee = 100 // len(indices_exacts)
-        for idx in indices_exacts:
-            poids[idx] = valeur_partagee
+        poids = np.zeros(len(distances), dtype=np.int64)
+        poids[indices_exacts] = 100 // len(indices_exacts)
         # Ajustement pour total = 100
-        poids[indices_exacts[-1]] += (100 - sum(poids))
-        return poids
+        poids[indices_exacts[-1]] += 100 - poids.sum()
+        return poids.tolist()
 
     # ÉTAPE 2 : Si pas d'exact, calcul par distance (Voisins proches)
-    distances = [abs(x - valeur_ref_gen) for x in liste_ref]
     # On ajoute 1e-10 pour éviter la division par zéro (sécurité)
-    poids_bruts = [1 / (d + 1e-10) for d in distances]
-    somme_poids = sum(poids_bruts)
-    
-    poids_normalises = [int(round(100 * p / somme_poids)) for p in poids_bruts]
+    poids_bruts = 1 / (distances + 1e-10)
+    poids_normalises = np.rint(100 * poids_bruts / poids_bruts.sum()).astype(np.int64)
     
     # Ajustement final pour que la somme soit exactement 100
-    if poids_normalises:
-        poids_normalises[-1] += 100 - sum(poids_normalises)
+    poids_normalises[-1] += 100 - poids_normalises.sum()
         
-    return poids_normalises
+    return poids_normalises.tolist()
+
+
+def calcul_ratio_batch(valeurs_ref_gen, valeurs_triees: np.ndarray, tolerance: float = 1e-6, entiers: bool = False):
+    """
+    Calcule en une passe les poids de toutes les valeurs de référence générées.
+
+    Retourne (indices, poids), deux tableaux (m, 2) : la ligne i donne les positions
+    dans 'valeurs_triees' des voisins de la i-ème valeur générée et leur poids (somme = 100).
+    Mêmes règles que calcul_ratio : 100 sur la valeur exacte, sinon pondération
+    par l'inverse de la distance aux deux voisins. Un indice -1 a un poids nul.
+    Avec entiers=True, les poids sont arrondis à l'entier comme dans calcul_ratio.
+    """
+    valeurs = np.asarray(valeurs_ref_gen, dtype=np.float64)
+    indices, exact = voisins_proches_batch(valeurs, valeurs_triees, tolerance)
+    presents = indices >= 0
+
+    voisins = valeurs_triees[np.clip(indices, 0, None)] if len(valeurs_triees) else np.zeros(indices.shape)
+    distances = np.abs(voisins - valeurs[:, None])
+    poids_bruts = np.where(presents, 1 / (distances + 1e-10), 0.0)
+    poids_bruts[exact] = [1.0, 0.0]
+
+    somme = poids_bruts.sum(axis=1, keepdims=True)
+    poids = np.divide(100 * poids_bruts, somme, out=np.zeros_like(poids_bruts), where=somme > 0)
+
+    if entiers:
+        # Arrondi de la borne inférieure, la borne supérieure complète à 100
+        poids = np.rint(poids)
+        deux_voisins = presents.all(axis=1)
+        poids[deux_voisins, 1] = 100 - poids[deux_voisins, 0]
+    return indices, poids
 
 
 
 def biais_moyen(data_sans_biais, data_ref, df_reel_complet, df_gen_complet=None, methode='medical'):
     ratio = data_sans_biais["ratio"]
-    resultats_final = {}
     colonnes_communes = data_sans_biais.columns.intersection(data_ref.columns).difference(["ratio", "ref"])
 
-    for col in colonnes_communes:
-        valeur_reelle_cible = data_ref[col].iloc[0]
-        valeur_generee = (data_sans_biais[col] * ratio).sum() / ratio.sum()
-        ecart_absolu = abs(valeur_reelle_cible - valeur_generee)
-        
-        if methode == 'strict':
-            # Calcul sans pitié : Erreur relative pure
-            erreur_pourcent = (ecart_absolu / (abs(valeur_reelle_cible) + 1e-10)) * 100
-        else:
-            # Calcul intelligent : Normalisation par l'étendue pour les petites valeurs
-            etendue_globale = df_reel_complet[col].max() - df_reel_complet[col].min()
-            moyenne_globale = abs(df_reel_complet[col].mean())
-            seuil = 0.1 * moyenne_globale
-            
-            if abs(valeur_reelle_cible) > seuil and etendue_globale > 1.0:
-                erreur_pourcent = (ecart_absolu / abs(valeur_reelle_cible)) * 100
-            else:
-                erreur_pourcent = (ecart_absolu / etendue_globale * 100) if etendue_globale > 0 else 0
-            
-        resultats_final[col] = erreur_pourcent
-
-    return pd.DataFrame([resultats_final])
+    valeurs_generees = data_sans_biais[colonnes_communes].mul(ratio, axis=0).sum() / ratio.sum()
+    resultats = biais_moyen_matrice(
+        valeurs_generees.to_frame().T,
+        data_ref[colonnes_communes].iloc[[0]],
+        df_reel_complet,
+        methode=methode
+    )
+    return resultats.reset_index(drop=True)
+
+
+def statistiques_globales(df_reel_complet: pd.DataFrame, colonnes) -> pd.DataFrame:
+    """
+    Calcule en une seule agrégation le min, le max et la moyenne de toutes les colonnes.
+    Lignes : 'min', 'max', 'mean' ; colonnes : les variables demandées.
+    """
+    return df_reel_complet[list(colonnes)].agg(["min", "max", "mean"]).astype(np.float64)
+
+
+def moyennes_ponderees(df_moyennes: pd.DataFrame, indices: np.ndarray, poids: np.ndarray) -> pd.DataFrame:
+    """
+    Moyennes pondérées des voisins pour toutes les références et toutes les colonnes à la fois.
+
+    'df_moyennes' (k lignes, une par valeur de l'index trié), 'indices' et 'poids' (m, 2)
+    tels que renvoyés par calcul_ratio_batch. Retourne un DataFrame (m, colonnes).
+    """
+    valeurs = df_moyennes.to_numpy(dtype=np.float64)
+    if len(valeurs) == 0:
+        return pd.DataFrame(np.nan, index=range(len(indices)), columns=df_moyennes.columns)
+
+    voisins = valeurs[np.clip(indices, 0, None)]                   # (m, 2, c)
+    w = np.where(indices >= 0, poids, 0.0)[:, :, None]             # (m, 2, 1)
+    numerateur = np.where(w > 0, voisins * w, 0.0).sum(axis=1)
+    denominateur = w.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        resultat = np.where(denominateur > 0, numerateur / denominateur, np.nan)
+    return pd.DataFrame(resultat, columns=df_moyennes.columns)
+
+
+def biais_moyen_matrice(valeurs_ponderees, valeurs_cibles, df_reel_complet=None, methode='medical', stats=None):
+    """
+    Moteur vectorisé de biais_moyen : toutes les références et toutes les colonnes en une opération.
+
+    'valeurs_ponderees' et 'valeurs_cibles' sont deux DataFrames alignés (m références x c colonnes).
+    Les étendues et moyennes globales viennent de 'stats' (voir statistiques_globales)
+    ou sont calculées une seule fois sur 'df_reel_complet'.
+    Retourne l'erreur en pourcentage, de même forme.
+    """
+    colonnes = valeurs_cibles.columns
+    cible = valeurs_cibles.to_numpy(dtype=np.float64)
+    ecart_absolu = np.abs(cible - valeurs_ponderees[colonnes].to_numpy(dtype=np.float64))
+
+    if methode == 'strict':
+        # Calcul sans pitié : Erreur relative pure
+        erreur = ecart_absolu / (np.abs(cible) + 1e-10) * 100
+    else:
+        # Calcul intelligent : Normalisation par l'étendue pour les petites valeurs
+        if stats is None:
+            stats = statistiques_globales(df_reel_complet, colonnes)
+        etendue_globale = (stats.loc["max", colonnes] - stats.loc["min", colonnes]).to_numpy(dtype=np.float64)
+        seuil = 0.1 * np.abs(stats.loc["mean", colonnes].to_numpy(dtype=np.float64))
+
+        relatif = (np.abs(cible) > seuil) & (etendue_globale > 1.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            erreur_relative = ecart_absolu / np.abs(cible) * 100
+            erreur_etendue = np.where(etendue_globale > 0, ecart_absolu / etendue_globale * 100, 0.0)
+        erreur = np.where(relatif, erreur_relative, erreur_etendue)
+
+    return pd.DataFrame(erreur, index=valeurs_cibles.index, columns=colonnes)
+
+
+def biais_par_reference(df_moyennes_reel, df_moyennes_gen, df_reel_complet=None, methode='medical', stats=None, entiers=False):
+    """
+    Équivalent vectorisé de la chaîne selection_valeur_ref_gen -> calcul_ratio -> biais_moyen
+    appliquée à chaque valeur de référence générée.
+
+    'df_moyennes_reel' et 'df_moyennes_gen' sont les sorties de moyenne_par_colone_référance.
+    Retourne le biais par référence générée (index 'ref') et par colonne commune.
+    """
+    colonnes = df_moyennes_gen.columns.intersection(df_moyennes_reel.columns).difference(["ratio", "ref"])
+    reel = df_moyennes_reel.sort_values("ref")
+    valeurs_triees = index_ref_trie(reel)
+    # Une ligne de 'reel' par valeur distincte de l'index trié
+    reel = reel.drop_duplicates("ref").dropna(subset=["ref"])
+
+    indices, poids = calcul_ratio_batch(df_moyennes_gen["ref"], valeurs_triees, entiers=entiers)
+    ponderees = moyennes_ponderees(reel[colonnes], indices, poids)
+    cibles = df_moyennes_gen[colonnes].reset_index(drop=True)
+
+    resultats = biais_moyen_matrice(ponderees, cibles, df_reel_complet, methode=methode, stats=stats)
+    resultats.index = pd.Index(df_moyennes_gen["ref"].to_numpy(), name="ref")
+    return resultats
 
 def moyenne_par_colone_référance(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -165,10 +337,83 @@ def moyenne_par_colone_référance(df: pd.DataFrame) -> pd.DataFrame:
 
 # --- NOUVELLE FONCTION : GÉNÉRATION DE RAPPORT AUTOMATIQUE ---
 
-def generate_pdf_report(df_bias_final, nom_colone_reference="ref"):
+# Rendered charts, keyed by (data hash, column, theme)
+CACHE_IMAGES = LRUCache(max_bytes=PDF_IMAGE_CACHE_MB * 1024 ** 2, sizeof=len)
+
+# Chart size in pixels (JPEG keeps a full report small)
+LARGEUR_GRAPHIQUE, HAUTEUR_GRAPHIQUE = 600, 400
+
+
+def empreinte_donnees(df: pd.DataFrame) -> str:
+    """Empreinte du contenu d'un DataFrame (clé du cache des graphiques)."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def rendre_graphique(df_bias_final, col, nom_colone_reference="ref", theme="clair"):
+    """
+    Construit le graphique de biais d'une colonne et le rend en JPEG (bytes).
+    Retourne None si le rendu échoue (Kaleido absent par exemple).
+    """
+    try:
+        # plotly.express n'est chargé qu'au premier graphique, pas au démarrage de l'application
+        import plotly.express as px
+
+        fig = px.line(
+            df_bias_final, 
+            x="ref", 
+            y=col,
+            title=f"Biais pour / Bias for '{col}' selon / according to '{nom_colone_reference}'",
+            markers=True,
+            labels={"ref": nom_colone_reference, col: "Biais Absolu / Absolute Bias"}
+        )
+        fig.update_traces(line_color=STATUS_COLORS[theme]["alia"], marker=dict(size=8))
+        fig.update_layout(
+            template="plotly_white", 
+            hovermode="x unified",
+            width=LARGEUR_GRAPHIQUE, 
+            height=HAUTEUR_GRAPHIQUE,
+            title_font_size=12,
+            title_x=0.5
+        )
+        # Add reference line at y=0
+        fig.add_hline(y=0, line_dash="dash", line_color='rgb(66, 77, 109)', 
+                     annotation_text="Biais nul / Zero bias")
+        return fig.to_image(format="jpeg", width=LARGEUR_GRAPHIQUE, height=HAUTEUR_GRAPHIQUE)
+    except Exception as e:
+        print(f"PDF Graph Error ({col}): {e}")
+        return None
+
+
+def rendre_graphiques(df_bias_final, colonnes, nom_colone_reference="ref", theme="clair"):
+    """
+    Rend les graphiques de toutes les colonnes, l'un après l'autre par défaut : Kaleido 0.2
+    exporte les images une à une dans un seul sous-processus, des threads n'y gagnent rien.
+    PDF_GRAPH_WORKERS > 1 ne sert qu'avec un moteur d'export capable de rendus simultanés.
+    Les images déjà produites pour les mêmes données et le même thème sont réutilisées.
+    """
+    cles = {col: (empreinte_donnees(df_bias_final[["ref", col]]), col, theme) for col in colonnes}
+    manquantes = [col for col in colonnes if cles[col] not in CACHE_IMAGES]
+
+    def rendre(col):
+        return rendre_graphique(df_bias_final, col, nom_colone_reference, theme)
+
+    if PDF_GRAPH_WORKERS > 1 and len(manquantes) > 1:
+        with ThreadPoolExecutor(max_workers=PDF_GRAPH_WORKERS) as pool:
+            rendus = list(pool.map(rendre, manquantes))
+    else:
+        rendus = [rendre(col) for col in manquantes]
+    for col, image in zip(manquantes, rendus):
+        if image is not None:
+            CACHE_IMAGES.put(cles[col], image)
+
+    return [CACHE_IMAGES.get(cles[col]) for col in colonnes]
+
+
+def generate_pdf_report(df_bias_final, nom_colone_reference="ref", theme="clair"):
     """
     Génère un rapport d'audit au format PDF bilingue (FR/EN) pour Alia Santé.
     Generates a bilingual (FR/EN) audit report in PDF format for Alia Santé.
+    Les graphiques suivent la couleur du thème / Charts follow the theme colour.
     """
     pdf = FPDF()
     pdf.add_page()
@@ -249,60 +494,35 @@ def generate_pdf_report(df_bias_final, nom_colone_reference="ref"):
                          "according to the reference. The dashed line represents zero bias.")
     pdf.ln(5)
 
-    # Generate and add graphs for each numeric column
-    for i, col in enumerate(numeric_cols[:3]):  # Limit to 3 graphs to avoid PDF size issues
-        try:
-            # Create the graph using plotly
-            fig = px.line(
-                df_bias_final, 
-                x="ref", 
-                y=col,
-                title=f"Biais pour / Bias for '{col}' selon / according to '{nom_colone_reference}'",
-                markers=True,
-                labels={"ref": nom_colone_reference, col: "Biais Absolu / Absolute Bias"}
-            )
-            fig.update_traces(line_color='rgb(216, 98, 122)', marker=dict(size=8))
-            fig.update_layout(
-                template="plotly_white", 
-                hovermode="x unified",
-                width=600, 
-                height=400,
-                title_font_size=12,
-                title_x=0.5
-            )
-            # Add reference line at y=0
-            fig.add_hline(y=0, line_dash="dash", line_color='rgb(66, 77, 109)', 
-                         annotation_text="Biais nul / Zero bias")
-
-            # Convert plot to image bytes
-            img_bytes = fig.to_image(format="png", width=600, height=400)
-            
-            # Save temporary image
-            temp_img_path = f"temp_graph_{i}.png"
-            with open(temp_img_path, "wb") as f:
-                f.write(img_bytes)
-            
+    # Generate and add graphs for each numeric column (rendered in memory, cached)
+    colonnes_graphiques = numeric_cols[:PDF_MAX_GRAPHS] if PDF_MAX_GRAPHS > 0 else numeric_cols
+    images = rendre_graphiques(df_bias_final, colonnes_graphiques, nom_colone_reference, theme)
+
+    # FPDF reads each image when pdf.image() is called: the folder is private to this report
+    # (reports may be built side by side) and removed once every chart is embedded
+    with tempfile.TemporaryDirectory(prefix="bias_auditor_pdf_") as dossier_images:
+        for i, (col, img_bytes) in enumerate(zip(colonnes_graphiques, images)):
+            if img_bytes is None:
+                # If graph generation fails, just add text
+                pdf.set_font("Arial", 'I', 9)
+                pdf.cell(0, 8, f"Graphique pour / Graph for {col}: Erreur de génération / Generation error", ln=True)
+                pdf.ln(5)
+                continue
+
             # Add to PDF
             if i > 0:  # Add new page for additional graphs
                 pdf.add_page()
-                
+
             pdf.set_font("Arial", 'B', 10)
             pdf.cell(0, 8, f"Graphique / Graph {i+1}: {col}", ln=True, align='C')
             pdf.ln(5)
-            
+
             # Add image to PDF (centered)
-            pdf.image(temp_img_path, x=10, w=190)
+            chemin_image = os.path.join(dossier_images, f"graphique_{i}.jpg")
+            with open(chemin_image, 'wb') as f:
+                f.write(img_bytes)
+            pdf.image(chemin_image, x=10, w=190)
             pdf.ln(10)
-            
-            # Clean up temp file
-            import os
-            os.remove(temp_img_path)
-            
-        except Exception as e:
-            # If graph generation fails, just add text
-            pdf.set_font("Arial", 'I', 9)
-            pdf.cell(0, 8, f"Graphique pour / Graph for {col}: Erreur de génération / Generation error", ln=True)
-            pdf.ln(5)
 
     # Interprétation et Recommandations / Interpretation and Recommendations
     pdf.ln(10)
@@ -334,7 +554,7 @@ def generate_pdf_report(df_bias_final, nom_colone_reference="ref"):
     pdf.cell(0, 10, "Document généré automatiquement / Automatically generated document - Alia Santé x ESIEE Paris", 0, 0, 'C')
 
     # Return PDF as bytes
-    return pdf.output()
+    return pdf.output(dest='S').encode('latin-1')
 
 
 
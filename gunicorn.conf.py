@@ -0,0 +1,20 @@
+# gunicorn.conf.py
+"""
+gunicorn settings of the production server (see wsgi.py), overridable through the environment.
+"""
+import os
+
+bind = os.environ.get("BIAS_AUDITOR_BIND", "0.0.0.0:8050")
+
+# Worker processes, each serving several requests at once (dashboard polls are short)
+workers = int(os.environ.get("BIAS_AUDITOR_SERVER_WORKERS", min(4, os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.environ.get("BIAS_AUDITOR_SERVER_THREADS", 8))
+
+# Heavy imports are done once in the master, before the workers are forked
+preload_app = True
+
+# Uploads of large datasets are parsed inside the request
+timeout = int(os.environ.get("BIAS_AUDITOR_SERVER_TIMEOUT", 300))
+
+accesslog = "-"
@@ -1,23 +1,206 @@
+import numpy as np
 import pandas as pd
-from fairlearn.metrics import demographic_parity_difference
 
-def run_fairness_audit(df, target_col, sensitive_col):
+from src.config import FAIRNESS_LABEL_COLUMNS, FAIRNESS_MAX_GROUPS
+
+# Columns of the fairness matrix, one row per (target, sensitive attribute)
+FAIRNESS_METRICS = ['dp_real', 'dp_gen', 'dp_gap', 'eo_real', 'eo_gen', 'eo_gap', 'group_bias', 'worst_group', 'label']
+
+
+# --- SENSITIVE ATTRIBUTES & OUTCOMES ---
+
+def sensitive_attributes(df, exclude=(), max_groups=FAIRNESS_MAX_GROUPS):
+    """
+    Columns audited as sensitive attributes: categorical (object, category, bool) columns
+    and integer columns with at most 'max_groups' distinct values.
+    """
+    columns = []
+    for c in df.columns:
+        if c in exclude:
+            continue
+        series = df[c]
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object or pd.api.types.is_bool_dtype(series):
+            columns.append(c)
+        elif pd.api.types.is_integer_dtype(series) and series.nunique() <= max_groups:
+            columns.append(c)
+    return columns
+
+
+def label_column(df, candidates=FAIRNESS_LABEL_COLUMNS):
+    """
+    Outcome column conditioning the equalized-odds metric: the first of 'candidates'
+    (FAIRNESS_LABEL_COLUMNS) present in df, compared case-insensitively. None when there is none.
+    """
+    columns = {str(c).lower(): c for c in df.columns}
+    return next((columns[name.lower()] for name in candidates if name.lower() in columns), None)
+
+
+def outcome_thresholds(df, columns):
     """
-    Performs a fairness audit using the Fairlearn library.
-    Calculates the Statistical Parity Difference (SPD).
+    Threshold of the positive outcome of each column, learnt on the real data and applied to both:
+    the larger value of a two-valued column, the values above the median otherwise,
+    the upper half of the sorted categories for a non-numeric column.
     """
-    if sensitive_col not in df.columns or target_col not in df.columns:
+    thresholds = {}
+    for c in columns:
+        values = df[c].dropna()
+        if not pd.api.types.is_numeric_dtype(values):
+            uniques = sorted(values.unique())
+            thresholds[c] = (uniques[len(uniques) // 2], True) if uniques else (None, True)
+        elif values.nunique() == 2:
+            thresholds[c] = (values.min(), False)
+        else:
+            thresholds[c] = (values.median(), False)
+    return thresholds
+
+
+def threshold_from_counts(counts, numeric=True):
+    """
+    Same threshold as outcome_thresholds from the exact counts of the values of a column
+    (a Series indexed by value), as accumulated chunk by chunk in out-of-core mode.
+    """
+    counts = counts[counts > 0].sort_index()
+    if not numeric:
+        uniques = list(counts.index)
+        return (uniques[len(uniques) // 2], True) if uniques else (None, True)
+    if len(counts) == 0:
+        return (None, False)
+    if len(counts) == 2:
+        return (counts.index[0], False)
+    cumulative, n = counts.cumsum().to_numpy(), counts.sum()
+    middle = counts.index[np.searchsorted(cumulative, [(n - 1) // 2, n // 2], side='right')]
+    return (float(np.mean(middle)), False)
+
+
+def positive_outcomes(series, threshold):
+    """1.0 for a positive outcome, 0.0 otherwise, NaN when the value is missing."""
+    value, inclusive = threshold
+    if value is None:
+        return pd.Series(np.nan, index=series.index, dtype=np.float32)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Compared once per category, then spread through the codes
+        categories = series.cat.categories
+        positive = np.append(categories >= value if inclusive else categories > value, False)
+        return pd.Series(positive[series.cat.codes], index=series.index).astype(np.float32).where(series.notna())
+    positive = series >= value if inclusive else series > value
+    return positive.astype(np.float32).where(series.notna())
+
+
+# --- GROUPED COUNTS ---
+
+def fairness_counts(df, targets, sensitive, label_col, thresholds):
+    """
+    Positive outcomes of every target per (sensitive group, label) for each sensitive attribute,
+    with one grouped aggregation per attribute. The label is the binarized outcome column
+    'label_col' (see label_column); it is -1 when missing, and for every row when there is no
+    outcome column. Counts of several chunks of a file can be added together.
+    """
+    positives = pd.DataFrame({c: positive_outcomes(df[c], thresholds[c]) for c in targets}, index=df.index)
+    if label_col is None or label_col not in df.columns:
+        label = pd.Series(-1.0, index=df.index, name='label')
+    else:
+        label = positive_outcomes(df[label_col], thresholds[label_col]).fillna(-1).rename('label')
+    counts = {}
+    for s in sensitive:
+        grouped = positives.groupby([df[s].rename('group'), label], observed=True)
+        counts[s] = (grouped.sum().astype(np.float64), grouped.count())
+    return counts
+
+
+def add_fairness_counts(total, counts):
+    """Adds the counts of one chunk to running totals (out-of-core mode)."""
+    if total is None:
+        return counts
+    return {
+        s: (total[s][0].add(sums, fill_value=0), total[s][1].add(n, fill_value=0))
+        for s, (sums, n) in counts.items()
+    }
+
+
+# --- FAIRNESS MATRIX ---
+
+def group_rates(sums, counts):
+    """Selection rate of every target per sensitive group (rows: groups, columns: targets)."""
+    return sums.groupby(level='group', observed=True).sum() / counts.groupby(level='group', observed=True).sum()
+
+
+def parity_difference(rates):
+    """Demographic parity difference: spread of the selection rates across groups, per target."""
+    return rates.max() - rates.min()
+
+
+def odds_difference(sums, counts):
+    """
+    Equalized-odds gap: spread across groups of the selection rate conditioned on the true
+    label (outcome column), taking the worst of the two label values, per target.
+    NaN when no row has a label.
+    """
+    rates = sums / counts
+    labels = rates.index.get_level_values('label')
+    gaps = [parity_difference(rates[labels == y].droplevel('label')) for y in (0.0, 1.0) if (labels == y).any()]
+    return pd.concat(gaps, axis=1).max(axis=1) if gaps else pd.Series(np.nan, index=rates.columns)
+
+
+def fairness_matrix(counts_r, counts_g, label=None):
+    """
+    Fairness of the generated data against the real data, for every (target, sensitive attribute)
+    pair: parity and equalized-odds gaps on both sides, and the largest per-group gap of selection rate.
+    'label' names the outcome column the counts were conditioned on (None: no equalized odds).
+    """
+    rows = []
+    for s, (sums_r, n_r) in counts_r.items():
+        if s not in counts_g:
+            continue
+        sums_g, n_g = counts_g[s]
+        rates_r, rates_g = group_rates(sums_r, n_r), group_rates(sums_g, n_g)
+        dp_r, dp_g = parity_difference(rates_r), parity_difference(rates_g)
+        eo_r, eo_g = odds_difference(sums_r, n_r), odds_difference(sums_g, n_g)
+        group_gaps = (rates_g - rates_r).abs()
+        for t in sums_r.columns:
+            if t == s:
+                continue
+            gaps = group_gaps[t].dropna()
+            rows.append({
+                'target': t, 'sensitive': s,
+                'dp_real': dp_r[t], 'dp_gen': dp_g[t], 'dp_gap': abs(dp_g[t] - dp_r[t]),
+                'eo_real': eo_r[t], 'eo_gen': eo_g[t], 'eo_gap': abs(eo_g[t] - eo_r[t]),
+                'group_bias': gaps.max() if len(gaps) else np.nan,
+                'worst_group': str(gaps.idxmax()) if len(gaps) else None,
+                'label': label,
+            })
+    return pd.DataFrame(rows, columns=['target', 'sensitive'] + FAIRNESS_METRICS).set_index(['target', 'sensitive'])
+
+
+def fairness_gap(matrix):
+    """
+    Fairness input of the global score: mean demographic parity gap between the generated
+    and the real data over all pairs (None when no sensitive attribute was found).
+    """
+    if matrix.empty or matrix['dp_gap'].isna().all():
         return None
+    return float(matrix['dp_gap'].mean())
 
-    try:
-        # Calculate Demographic Parity Difference (SPD)
-        # It requires the target to be binary or categorical for meaningful results
-        spd = demographic_parity_difference(
-            df[target_col],
-            df[target_col], # Comparing distribution against itself as a baseline
-            sensitive_features=df[sensitive_col]
-        )
-        return float(spd)
-    except Exception as e:
-        print(f"Fairness Audit Error: {e}")
-        return None
\ No newline at end of file
+
+def fairness_records(matrix):
+    """JSON-serializable rows of a fairness matrix."""
+    return [
+        {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}
+        for row in matrix.reset_index().to_dict('records')
+    ]
+
+
+def run_fairness_audit(df_r, df_g, ref_col, targets, sensitive=None, label_col=None):
+    """
+    Fairness audit of a (real, generated) pair over every target and sensitive attribute.
+    The equalized odds are conditioned on 'label_col' (see label_column by default).
+    Returns the fairness matrix (see fairness_matrix).
+    """
+    if sensitive is None:
+        sensitive = sensitive_attributes(df_r, exclude=[ref_col])
+    sensitive = [s for s in sensitive if s in df_g.columns]
+    if label_col is None:
+        label_col = label_column(df_r)
+    thresholds = outcome_thresholds(df_r, list(dict.fromkeys(list(targets) + ([label_col] if label_col else []))))
+    counts_r = fairness_counts(df_r, targets, sensitive, label_col, thresholds)
+    counts_g = fairness_counts(df_g, targets, sensitive, label_col, thresholds)
+    return fairness_matrix(counts_r, counts_g, label_col)
@@ -0,0 +1,250 @@
+# src/batch.py
+"""
+Headless batch auditor.
+
+Usage:
+    python -m src.batch data/manifest_example.csv --output results/ --pdf
+
+The manifest lists (real, generated) file pairs, either as a CSV with the columns
+'real', 'generated' and optionally 'name', or as a JSON list of objects with the same keys.
+Relative paths are resolved from the manifest location. Dataset files may be CSV, Parquet
+(.parquet/.pq) or Arrow IPC/Feather (.arrow/.feather), the latter being memory-mapped.
+"""
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from src.config import EXECUTOR_KIND, EXECUTOR_WORKERS
+from src.executor import parallel_map
+from src.ingestion import file_content_key, frame_to_columnar_bytes, read_dataset_file
+from src.out_of_core import run_out_of_core_audit
+from src.pipeline import compute_profiled_bias_table, leaderboard, run_profiled_audit
+from src.real_profile import get_real_profile, load_real_profile
+from src.result_store import RESULT_STORE, STORED_FIELDS, audit_method
+from src.utils import get_bias_status
+
+# Output formats written through Arrow
+COLUMNAR_FORMATS = {'parquet', 'arrow'}
+
+
+# --- MANIFEST ---
+
+def load_manifest(path):
+    """Reads the list of pairs to audit and resolves their paths."""
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+    else:
+        entries = pd.read_csv(path, dtype=str).to_dict('records')
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    pairs = []
+    for i, entry in enumerate(entries):
+        real = os.path.join(base_dir, entry['real'])
+        generated = os.path.join(base_dir, entry['generated'])
+        name = entry.get('name') if isinstance(entry.get('name'), str) else None
+        pairs.append({
+            'name': name or f"{i + 1:03d}_{os.path.splitext(os.path.basename(generated))[0]}",
+            'real': real,
+            'generated': generated,
+        })
+    return pairs
+
+
+# --- AUDIT ---
+
+def audit_pair(pair, selected=None, approx=False, bias_table=False, out_of_core=False):
+    """
+    Audits one manifest entry (pool worker). Errors are reported, not raised.
+    With 'bias_table', the per-reference bias table (DataFrame) is returned as well.
+    With 'out_of_core', both files are streamed instead of loaded (see src.out_of_core).
+    Otherwise the real file is only read when its profile does not exist yet (see src.real_profile).
+    A pair audited before with the same columns and method is served from the result store.
+    """
+    start = time.perf_counter()
+    result = dict(pair)
+    try:
+        result['real_key'] = pair.get('real_key') or file_content_key(pair['real'])
+        result['generated_key'] = file_content_key(pair['generated'])
+        RESULT_STORE.name_dataset(result['real_key'], os.path.basename(pair['real']))
+        RESULT_STORE.name_dataset(result['generated_key'], os.path.basename(pair['generated']))
+        method = audit_method(approx, out_of_core)
+        # The bias table is not stored: it is always computed
+        stored = None if bias_table else RESULT_STORE.find(result['real_key'], result['generated_key'], selected, method)
+        if stored is not None:
+            result.update(stored, cached=True)
+        # Pairs already run in parallel: the columns (or files) of one pair are processed serially
+        elif out_of_core:
+            result.update(run_out_of_core_audit(pair['real'], pair['generated'], selected,
+                                                executor_kind='serial', bias_table=bias_table))
+        else:
+            profile = load_real_profile(result['real_key'])
+            if profile is None:
+                profile = get_real_profile(result['real_key'], read_dataset_file(pair['real'], key=result['real_key']))
+            df_g = read_dataset_file(pair['generated'], key=result['generated_key'])
+            result.update(run_profiled_audit(profile, df_g, selected, executor_kind='serial', approx=approx))
+            if bias_table:
+                result['bias_table'] = compute_profiled_bias_table(profile, df_g, list(result['columns']))
+        if stored is None:
+            RESULT_STORE.put(result['real_key'], result['generated_key'], selected, method,
+                             {f: result[f] for f in STORED_FIELDS if f in result})
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['duration_s'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def profile_real_datasets(pairs):
+    """
+    Builds the missing real-data profiles once per distinct real file, before the pairs fan out,
+    and records the real keys in the pairs so that workers do not hash the real files again.
+    """
+    keys = {}
+    for path in dict.fromkeys(pair['real'] for pair in pairs):
+        try:
+            keys[path] = file_content_key(path)
+            if load_real_profile(keys[path]) is None:
+                get_real_profile(keys[path], read_dataset_file(path, key=keys[path]))
+        except Exception as e:
+            # Reported by audit_pair for each pair using this file
+            print(f"Real Profile Error: {e}")
+    return [dict(pair, real_key=keys.get(pair['real'])) for pair in pairs]
+
+
+def _audit_task(args):
+    return audit_pair(*args)
+
+
+def audit_manifest(pairs, selected=None, kind=EXECUTOR_KIND, max_workers=EXECUTOR_WORKERS, approx=False,
+                   bias_table=False, out_of_core=False):
+    """Audits every pair of the manifest in parallel."""
+    if not out_of_core:
+        pairs = profile_real_datasets(pairs)
+    tasks = [(pair, selected, approx, bias_table, out_of_core) for pair in pairs]
+    return parallel_map(_audit_task, tasks, kind=kind, max_workers=max_workers)
+
+
+# --- OUTPUTS ---
+
+def scores_table(results):
+    """One row per audited pair."""
+    return pd.DataFrame([{
+        'name': r['name'], 'real': r['real'], 'generated': r['generated'],
+        'global_score': r.get('global_score'), 'fairness_gap': r.get('fairness_gap'),
+        'mean_bias': pd.Series([m['bias'] for m in r.get('columns', {}).values()], dtype=float).mean(),
+        'duration_s': r['duration_s'], 'error': r.get('error'),
+    } for r in results])
+
+
+def columns_table(results, thresholds=(15, 40)):
+    """One row per (pair, audited column)."""
+    return pd.DataFrame([
+        dict(name=r['name'], column=col, status=get_bias_status(m['bias'], thresholds), **m)
+        for r in results for col, m in r.get('columns', {}).items()
+    ])
+
+
+def write_pdf_reports(results, output_dir, thresholds=(15, 40)):
+    """Writes one PDF report per successfully audited pair."""
+    from src.reporting import generate_pdf_bytes
+
+    for r in results:
+        if 'error' in r:
+            continue
+        report_data = (
+            dict(m, name=col, status=get_bias_status(m['bias'], thresholds))
+            for col, m in r['columns'].items()
+        )
+        summary = {key: r[key] for key in ('global_score', 'fairness_gap', 'fairness', 'reference')}
+        with open(os.path.join(output_dir, f"{r['name']}.pdf"), 'wb') as f:
+            f.write(generate_pdf_bytes(report_data, summary))
+
+
+def fairness_table(results):
+    """One row per (pair, target, sensitive attribute)."""
+    return pd.DataFrame([dict(name=r['name'], **row) for r in results for row in r.get('fairness', [])])
+
+
+def leaderboard_table(results):
+    """Candidates ranked by global score, separately for each real file of the manifest."""
+    rows = []
+    for real in dict.fromkeys(r['real'] for r in results):
+        audits = {r['name']: r for r in results if r['real'] == real and 'error' not in r}
+        if audits:
+            board = leaderboard(audits)
+            board.insert(2, 'real', real)
+            rows += board.to_dict('records')
+    # Boards of different real files have different bias columns: rows are merged by name
+    return pd.DataFrame(rows)
+
+
+def write_columnar_results(results, output_dir, fmt='parquet', thresholds=(15, 40)):
+    """Writes the score and column tables, and the per-reference bias table of each pair, as Parquet/Arrow."""
+    extension = 'parquet' if fmt == 'parquet' else 'arrow'
+    tables = {
+        'scores': scores_table(results), 'columns': columns_table(results, thresholds),
+        'leaderboard': leaderboard_table(results), 'fairness': fairness_table(results),
+    }
+    for r in results:
+        if r.get('bias_table') is not None:
+            tables[f"{r['name']}_bias"] = r['bias_table']
+    for name, df in tables.items():
+        with open(os.path.join(output_dir, f"{name}.{extension}"), 'wb') as f:
+            f.write(frame_to_columnar_bytes(df, fmt))
+
+
+def write_results(results, output_dir, formats=('json', 'csv'), pdf=False, thresholds=(15, 40)):
+    """Writes the batch results in the requested formats."""
+    os.makedirs(output_dir, exist_ok=True)
+    if 'json' in formats:
+        with open(os.path.join(output_dir, 'results.json'), 'w', encoding='utf-8') as f:
+            json.dump([{k: v for k, v in r.items() if k != 'bias_table'} for r in results],
+                      f, indent=2, ensure_ascii=False, default=float)
+    if 'csv' in formats:
+        scores_table(results).to_csv(os.path.join(output_dir, 'scores.csv'), index=False)
+        columns_table(results, thresholds).to_csv(os.path.join(output_dir, 'columns.csv'), index=False)
+        leaderboard_table(results).to_csv(os.path.join(output_dir, 'leaderboard.csv'), index=False)
+        fairness_table(results).to_csv(os.path.join(output_dir, 'fairness.csv'), index=False)
+    for fmt in COLUMNAR_FORMATS.intersection(formats):
+        write_columnar_results(results, output_dir, fmt, thresholds)
+    if pdf:
+        write_pdf_reports(results, output_dir, thresholds)
+
+
+# --- COMMAND LINE ---
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Audits many (real, generated) dataset pairs without the dashboard.")
+    parser.add_argument('manifest', help="CSV or JSON manifest of (real, generated[, name]) pairs")
+    parser.add_argument('-o', '--output', default='audit_results', help="Output directory")
+    parser.add_argument('-f', '--format', nargs='+', default=['json', 'csv'], choices=['json', 'csv', 'parquet', 'arrow'])
+    parser.add_argument('--pdf', action='store_true', help="Also write one PDF report per pair")
+    parser.add_argument('--columns', nargs='+', default=None, help="Restrict the audit to these columns")
+    parser.add_argument('--thresholds', nargs=2, type=float, default=[15, 40], metavar=('VIGILANCE', 'CRITIQUE'))
+    parser.add_argument('--approx', action='store_true', help="Sketch-based approximate statistics (very large files)")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Stream the files chunk by chunk instead of loading them (larger than RAM)")
+    parser.add_argument('--executor', default=EXECUTOR_KIND, choices=['process', 'thread', 'serial'])
+    parser.add_argument('--workers', type=int, default=EXECUTOR_WORKERS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pairs = load_manifest(args.manifest)
+    results = audit_manifest(pairs, args.columns, kind=args.executor, max_workers=args.workers, approx=args.approx,
+                             bias_table=bool(COLUMNAR_FORMATS.intersection(args.format)), out_of_core=args.out_of_core)
+    write_results(results, args.output, args.format, args.pdf, sorted(args.thresholds))
+
+    failed = [r for r in results if 'error' in r]
+    for r in results:
+        outcome = r['error'] if 'error' in r else f"{r['global_score']}%"
+        print(f"{r['name']}: {outcome} ({r['duration_s']}s)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,213 @@
+# src/cache.py
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.config import DATASET_CACHE_MAX_MB, DATASET_CACHE_MAX_ITEMS, SHARED_CACHE_DIR, SHARED_CACHE_MAX_AGE_H
+
+
+def dataframe_nbytes(df):
+    """Returns the in-memory footprint of a DataFrame, object columns included."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache.
+    Bounded by a number of entries and, when a 'sizeof' function is given,
+    by the total size of the stored values.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, sizeof=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def get(self, key, default=None):
+        """Returns the cached value and marks it as most recently used."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        """Stores a value, evicting the least recently used entries if needed."""
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._nbytes += size
+            self._evict()
+        return key
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key]
+            self._remove(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._nbytes -= self._sizes.pop(key)
+
+    def _evict(self):
+        # The entry just inserted (last one) is always kept, even if it exceeds the cap alone
+        def over_limit():
+            too_many = self.max_items is not None and len(self._entries) > self.max_items
+            too_big = self.max_bytes is not None and self._nbytes > self.max_bytes
+            return too_many or too_big
+
+        while over_limit() and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+
+
+# --- SHARED BETWEEN SERVER WORKERS ---
+
+class SharedDirectory:
+    """
+    Values shared by the worker processes of the server, one file per key.
+    Files are written atomically (temporary file + rename): a worker never reads a partial value.
+    Disabled (every call is a no-op) when 'path' is empty.
+    """
+
+    def __init__(self, path, suffix='.pkl', write=None, read=None, max_age_h=SHARED_CACHE_MAX_AGE_H):
+        self.path = path
+        self.suffix = suffix
+        self._write = write or (lambda value, f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+        self._read = read or pickle.load
+        self.max_age_s = max_age_h * 3600
+        self._last_prune = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def file_of(self, key):
+        return os.path.join(self.path, f"{key}{self.suffix}")
+
+    def exists(self, key):
+        return self.enabled and os.path.exists(self.file_of(key))
+
+    def save(self, key, value):
+        if not self.enabled:
+            return
+        tmp_path = None
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                self._write(value, f)
+            os.replace(tmp_path, self.file_of(key))
+        except (OSError, pickle.PicklingError, ValueError, TypeError) as e:
+            print(f"Shared Cache Save Error: {e}")
+        finally:
+            # A failed write leaves no temporary file behind (it is gone once renamed)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self.prune()
+
+    def load(self, key):
+        """Shared value of 'key', None if no worker stored it."""
+        if not self.exists(key):
+            return None
+        try:
+            with open(self.file_of(key), 'rb') as f:
+                return self._read(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+            print(f"Shared Cache Load Error: {e}")
+            return None
+
+    def prune(self):
+        """Removes the files older than max_age_h (at most once a minute per process)."""
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        try:
+            for entry in os.scandir(self.path):
+                if now - entry.stat().st_mtime > self.max_age_s:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class SharedLRUCache(LRUCache):
+    """
+    LRU cache whose entries are also written to a SharedDirectory: an entry stored by one
+    server worker is reloaded from disk by the others on their first access.
+    """
+
+    def __init__(self, shared=None, **kwargs):
+        super().__init__(**kwargs)
+        self.shared = shared or SharedDirectory('')
+
+    def __contains__(self, key):
+        return super().__contains__(key) or self.shared.exists(key)
+
+    def get(self, key, default=None):
+        value = super().get(key)
+        if value is None:
+            value = self.shared.load(key)
+            if value is None:
+                return default
+            super().put(key, value)
+        return value
+
+    def put(self, key, value):
+        super().put(key, value)
+        self.shared.save(key, value)
+        return key
+
+
+def shared_directory(name, **kwargs):
+    """SharedDirectory 'name' under SHARED_CACHE_DIR (disabled outside the multi-worker mode)."""
+    return SharedDirectory(os.path.join(SHARED_CACHE_DIR, name) if SHARED_CACHE_DIR else '', **kwargs)
+
+
+class DatasetCache(SharedLRUCache):
+    """
+    Server-side store of the parsed DataFrames, keyed by content hash.
+    The browser only keeps the key in its dcc.Store. In the multi-worker mode the frames
+    are shared as Parquet files, which keep their compact dtypes.
+    """
+
+    def __init__(self, max_items=DATASET_CACHE_MAX_ITEMS, max_mb=DATASET_CACHE_MAX_MB):
+        shared = shared_directory('datasets', suffix='.parquet',
+                                  write=lambda df, f: df.to_parquet(f), read=pd.read_parquet)
+        super().__init__(shared=shared, max_items=max_items, max_bytes=max_mb * 1024 ** 2, sizeof=dataframe_nbytes)
+
+
+# Shared instance used by the Dash callbacks
+DATASET_CACHE = DatasetCache()
@@ -0,0 +1,117 @@
+# src/config.py
+import os
+
+# --- RUNTIME CONFIGURATION ---
+# Every setting can be overridden through an environment variable so that the
+# same code runs on a laptop and on the production containers.
+
+def _env_int(name, default):
+    """Reads an integer environment variable, falling back to a default."""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+# Upper bound (in MB) of the memory used by parsed datasets kept server-side
+DATASET_CACHE_MAX_MB = _env_int("BIAS_AUDITOR_CACHE_MB", 1024)
+
+# Maximum number of datasets kept server-side, whatever their size
+DATASET_CACHE_MAX_ITEMS = _env_int("BIAS_AUDITOR_CACHE_ITEMS", 32)
+
+# Number of CSV rows parsed at once by the streaming ingestion
+INGESTION_CHUNK_ROWS = _env_int("BIAS_AUDITOR_CHUNK_ROWS", 100_000)
+
+# Number of (dataset pair, column) metric entries memoized between callbacks
+METRICS_CACHE_MAX_ITEMS = _env_int("BIAS_AUDITOR_METRICS_CACHE_ITEMS", 4096)
+
+# Pool used to fan per-column statistics out: 'process', 'thread' or 'serial'
+EXECUTOR_KIND = os.environ.get("BIAS_AUDITOR_EXECUTOR", "process").lower()
+
+# Number of pool workers (defaults to the number of cores)
+EXECUTOR_WORKERS = _env_int("BIAS_AUDITOR_WORKERS", os.cpu_count() or 1)
+
+# Below this many values per column, dispatching to a pool costs more than it saves
+PARALLEL_MIN_ROWS = _env_int("BIAS_AUDITOR_PARALLEL_MIN_ROWS", 50_000)
+
+# Number of audit runs kept in the profiling history shown on the admin page
+PROFILE_HISTORY_SIZE = _env_int("BIAS_AUDITOR_PROFILE_HISTORY", 50)
+
+# Traces Python allocations per stage (precise peaks, but slows the audit down)
+PROFILE_TRACE_MEMORY = os.environ.get("BIAS_AUDITOR_PROFILE_MEMORY", "0") == "1"
+
+# Items kept per level of the quantile sketches of the approximate statistics mode
+SKETCH_SIZE = _env_int("BIAS_AUDITOR_SKETCH_SIZE", 2048)
+
+# Bins of the fixed-width histograms (entropy) of the approximate statistics mode
+SKETCH_BINS = _env_int("BIAS_AUDITOR_SKETCH_BINS", 64)
+
+# Number of column sketches memoized between audits
+SKETCH_CACHE_MAX_ITEMS = _env_int("BIAS_AUDITOR_SKETCH_CACHE_ITEMS", 2048)
+
+# Audit jobs running at the same time (each job holds one worker thread)
+AUDIT_JOB_WORKERS = _env_int("BIAS_AUDITOR_JOB_WORKERS", 4)
+
+# Columns computed per step of an audit job (results are published after each step)
+AUDIT_JOB_COLUMN_BATCH = _env_int("BIAS_AUDITOR_JOB_COLUMN_BATCH", 8)
+
+# Finished jobs kept in memory for the dashboards polling them
+AUDIT_JOB_HISTORY = _env_int("BIAS_AUDITOR_JOB_HISTORY", 256)
+
+# Threads rendering the charts of a PDF report. Kaleido 0.2 exports one image at a time in a
+# single subprocess, so more than 1 only helps with an export engine that renders concurrently
+PDF_GRAPH_WORKERS = _env_int("BIAS_AUDITOR_PDF_WORKERS", 1)
+
+# Maximum number of charts in a PDF report (0 = one per column)
+PDF_MAX_GRAPHS = _env_int("BIAS_AUDITOR_PDF_MAX_GRAPHS", 0)
+
+# Memory (MB) of the rendered PDF charts kept for later reports
+PDF_IMAGE_CACHE_MB = _env_int("BIAS_AUDITOR_PDF_IMAGE_CACHE_MB", 64)
+
+# Directory of the artifacts persisted between runs, such as real-data profiles (empty = memory only)
+CACHE_DIR = os.environ.get("BIAS_AUDITOR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "bias_auditor"))
+
+# Real-data profiles kept in memory (the others are reloaded from CACHE_DIR), by count and total size
+REAL_PROFILE_CACHE_ITEMS = _env_int("BIAS_AUDITOR_REAL_PROFILE_ITEMS", 8)
+REAL_PROFILE_CACHE_MB = _env_int("BIAS_AUDITOR_REAL_PROFILE_MB", 512)
+
+# Integer columns with at most this many distinct values are audited as sensitive attributes
+FAIRNESS_MAX_GROUPS = _env_int("BIAS_AUDITOR_FAIRNESS_MAX_GROUPS", 10)
+
+# Outcome (true label) column of the equalized-odds metric: the first of these names found in the
+# real dataset (comma-separated, case-insensitive). Without one, only demographic parity is audited
+FAIRNESS_LABEL_COLUMNS = [
+    c.strip() for c in os.environ.get(
+        "BIAS_AUDITOR_FAIRNESS_LABELS", "target,condition,diagnosis,label,outcome,class"
+    ).split(",") if c.strip()
+]
+
+# Variable cards rendered per page of the dashboard (the other pages are rendered on demand)
+DASHBOARD_CARDS_PER_PAGE = _env_int("BIAS_AUDITOR_CARDS_PER_PAGE", 24)
+
+# Text columns with at most this many distinct values (and no more than half the rows) are loaded as categoricals
+CATEGORY_MAX_VALUES = _env_int("BIAS_AUDITOR_CATEGORY_MAX_VALUES", 1000)
+
+# Compact schemas (dtypes and categories) of the parsed files kept in memory (the others are reloaded from CACHE_DIR)
+SCHEMA_CACHE_MAX_ITEMS = _env_int("BIAS_AUDITOR_SCHEMA_CACHE_ITEMS", 256)
+
+# Multi-worker server mode (see wsgi.py): parsed datasets and audit jobs are written to this
+# directory so that a request served by any worker finds them (empty = per-process memory only)
+SHARED_CACHE = os.environ.get("BIAS_AUDITOR_SHARED_CACHE", "0") == "1"
+SHARED_CACHE_DIR = os.environ.get(
+    "BIAS_AUDITOR_SHARED_CACHE_DIR", os.path.join(CACHE_DIR, "shared") if CACHE_DIR else ""
+) if SHARED_CACHE else ""
+
+# Shared files older than this (hours) are removed
+SHARED_CACHE_MAX_AGE_H = _env_int("BIAS_AUDITOR_SHARED_CACHE_MAX_AGE_H", 24)
+
+# A shared job not updated for this long (seconds) is considered lost with its worker and runs again
+AUDIT_JOB_STALE_S = _env_int("BIAS_AUDITOR_JOB_STALE_S", 600)
+
+# SQLite store of the finished audits, reused by identical requests (empty = no persistence)
+RESULT_STORE_PATH = os.environ.get(
+    "BIAS_AUDITOR_RESULT_STORE", os.path.join(CACHE_DIR, "audit_results.sqlite") if CACHE_DIR else ""
+)
+
+# Stored audits not reused for this many days are evicted, then the least recently used ones above the size cap
+RESULT_STORE_MAX_AGE_DAYS = _env_int("BIAS_AUDITOR_RESULT_STORE_MAX_AGE_DAYS", 90)
+RESULT_STORE_MAX_MB = _env_int("BIAS_AUDITOR_RESULT_STORE_MB", 256)
@@ -0,0 +1,62 @@
+# src/executor.py
+import atexit
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.config import EXECUTOR_KIND, EXECUTOR_WORKERS
+
+_POOLS = {}
+_LOCK = threading.Lock()
+
+# Pools are created from job threads and threaded server workers: forking such a process could
+# copy locks held by other threads into the children, so workers start from a clean process
+PROCESS_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def get_executor(kind=EXECUTOR_KIND, max_workers=EXECUTOR_WORKERS):
+    """Returns the shared pool of the requested kind, created on first use."""
+    with _LOCK:
+        pool = _POOLS.get(kind)
+        if pool is None:
+            if kind == 'process':
+                pool = ProcessPoolExecutor(max_workers=max_workers,
+                                           mp_context=multiprocessing.get_context(PROCESS_START_METHOD))
+            else:
+                pool = ThreadPoolExecutor(max_workers=max_workers)
+            _POOLS[kind] = pool
+        return pool
+
+
+def shutdown_executors():
+    """Stops every shared pool (registered at exit)."""
+    with _LOCK:
+        for pool in _POOLS.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
+
+
+atexit.register(shutdown_executors)
+
+
+def parallel_map(func, items, kind=EXECUTOR_KIND, max_workers=EXECUTOR_WORKERS):
+    """
+    Applies 'func' to every item on the configured pool and gathers results in order.
+    Falls back to a serial loop when parallelism is disabled, pointless or broken.
+    'func' must be a module-level function for the process pool.
+    """
+    items = list(items)
+    if kind == 'serial' or max_workers <= 1 or len(items) < 2:
+        return [func(item) for item in items]
+
+    try:
+        return list(get_executor(kind, max_workers).map(func, items))
+    except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+        print(f"Parallel execution failed ({e}), running serially.")
+        with _LOCK:
+            broken = _POOLS.pop(kind, None)
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        return [func(item) for item in items]
@@ -0,0 +1,307 @@
+# src/ingestion.py
+import base64
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.cache import LRUCache
+from src.config import CACHE_DIR, CATEGORY_MAX_VALUES, INGESTION_CHUNK_ROWS, SCHEMA_CACHE_MAX_ITEMS
+
+# Number of base64 characters decoded at once (multiple of 4, ~768 KB decoded)
+BASE64_BLOCK_CHARS = 4 * 256 * 1024
+
+
+# --- INCREMENTAL BASE64 DECODING ---
+
+def iter_base64_blocks(encoded, block_chars=BASE64_BLOCK_CHARS):
+    """Yields the decoded bytes of a base64 string block by block."""
+    for start in range(0, len(encoded), block_chars):
+        yield base64.b64decode(encoded[start:start + block_chars])
+
+
+def base64_content_key(encoded):
+    """
+    Hashes the decoded content of a base64 string without materializing it.
+    The key is the SHA-256 hex digest of the file bytes: two uploads of the same file
+    (whatever its name) share it, and file_content_key gives it for the file on disk.
+    """
+    digest = hashlib.sha256()
+    for block in iter_base64_blocks(encoded):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+class Base64Reader(io.RawIOBase):
+    """
+    Read-only binary stream over a base64 string.
+    Only one decoded block is held in memory at a time.
+    """
+
+    def __init__(self, encoded, block_chars=BASE64_BLOCK_CHARS):
+        self._blocks = iter_base64_blocks(encoded, block_chars)
+        self._buffer = bytearray()
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while len(self._buffer) < len(target):
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._buffer += block
+        n = min(len(target), len(self._buffer))
+        target[:n] = self._buffer[:n]
+        del self._buffer[:n]
+        return n
+
+
+# --- DTYPE DOWNCASTING ---
+
+def downcast_frame(df):
+    """
+    Converts columns to the smallest dtype able to hold them (int8/int16/... for integer codes,
+    float32 for measures, categorical for text columns with few distinct values).
+    """
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='float')
+        elif series.dtype == object:
+            distinct = series.nunique()
+            if distinct <= CATEGORY_MAX_VALUES and distinct <= len(series) // 2:
+                df[col] = series.astype('category')
+    return df
+
+
+def align_categories(chunks):
+    """
+    Gives a categorical column the same categories in every chunk,
+    so that concatenating the chunks keeps it categorical.
+    """
+    for col in chunks[0].columns:
+        dtypes = [chunk[col].dtype for chunk in chunks]
+        if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        categories = dtypes[0].categories
+        for dtype in dtypes[1:]:
+            categories = categories.union(dtype.categories)
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return chunks
+
+
+# --- COMPACT SCHEMA CACHE ---
+
+# Compact dtypes of the files already parsed, by content key: parsing a known file
+# again goes straight to its compact dtypes, without inference nor downcasting
+SCHEMA_CACHE = LRUCache(max_items=SCHEMA_CACHE_MAX_ITEMS)
+
+
+def frame_schema(df):
+    """Dtype of every column of a compact frame (categories included)."""
+    return dict(df.dtypes)
+
+
+def schema_path(key):
+    return os.path.join(CACHE_DIR, 'schemas', f"{key}.pkl")
+
+
+def save_schema(key, schema):
+    """Caches the schema of the file 'key', and writes it atomically under CACHE_DIR when enabled."""
+    if key is None:
+        return
+    SCHEMA_CACHE.put(key, schema)
+    if not CACHE_DIR:
+        return
+    path = schema_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(schema, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Schema Save Error: {e}")
+
+
+def load_schema(key):
+    """Schema of the file 'key' from memory or disk, None if it was never parsed."""
+    if key is None:
+        return None
+    schema = SCHEMA_CACHE.get(key)
+    if schema is not None or not CACHE_DIR or not os.path.exists(schema_path(key)):
+        return schema
+    try:
+        with open(schema_path(key), 'rb') as f:
+            schema = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        print(f"Schema Load Error: {e}")
+        return None
+    SCHEMA_CACHE.put(key, schema)
+    return schema
+
+
+# --- CHUNKED CSV READING ---
+
+def read_csv_chunked(source, chunksize=INGESTION_CHUNK_ROWS, schema=None, **read_csv_kwargs):
+    """
+    Parses a CSV chunk by chunk, downcasting each chunk before it is kept
+    (or parsing it directly into the compact dtypes of 'schema' when the file is known).
+    Returns the compact DataFrame.
+    """
+    return collect_chunks(pd.read_csv(source, chunksize=chunksize, dtype=schema, **read_csv_kwargs), schema)
+
+
+def collect_chunks(frames, schema=None):
+    """
+    Downcasts and concatenates DataFrame chunks.
+    Chunks already in the compact dtypes of 'schema' are kept as they are.
+    """
+    chunks = [chunk if schema is not None else downcast_frame(chunk) for chunk in frames]
+
+    if not chunks:
+        return pd.DataFrame()
+    df = chunks[0] if len(chunks) == 1 else pd.concat(align_categories(chunks), ignore_index=True)
+    if schema is not None:
+        return df
+    # Chunks may disagree (e.g. int8 vs float32 when NaNs appear late)
+    return downcast_frame(df)
+
+
+def read_base64_csv(encoded, chunksize=INGESTION_CHUNK_ROWS, schema=None):
+    """Parses a base64-encoded CSV (Dash upload) without decoding it all at once."""
+    stream = io.BufferedReader(Base64Reader(encoded))
+    return read_csv_chunked(stream, chunksize=chunksize, schema=schema, encoding='utf-8')
+
+
+# --- COLUMNAR FORMATS (PARQUET / ARROW IPC / FEATHER) ---
+
+COLUMNAR_EXTENSIONS = {
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow', '.arrows': 'arrow',
+}
+
+
+def columnar_format(filename):
+    """'parquet' or 'arrow' for a columnar file name, None for CSV."""
+    return COLUMNAR_EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def iter_record_batches(source, fmt, batch_rows=INGESTION_CHUNK_ROWS, columns=None):
+    """
+    Yields the record batches of a Parquet or Arrow IPC/Feather source, optionally restricted to 'columns'.
+    Paths are memory-mapped: Arrow batches are then read without any copy.
+    """
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(source, memory_map=isinstance(source, str))
+        yield from parquet_file.iter_batches(batch_size=batch_rows, columns=columns)
+        return
+    if isinstance(source, str):
+        source = pa.memory_map(source)
+    try:
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        # Streaming IPC format (no footer)
+        source.seek(0)
+        batches = pa.ipc.open_stream(source)
+    for batch in batches:
+        yield batch if columns is None else batch.select(columns)
+
+
+def read_columnar(source, fmt, batch_rows=INGESTION_CHUNK_ROWS, schema=None):
+    """Columnar counterpart of read_csv_chunked: returns the compact DataFrame."""
+    batches = iter_record_batches(source, fmt, batch_rows)
+    if schema is None:
+        return collect_chunks(batch.to_pandas() for batch in batches)
+    return collect_chunks((batch.to_pandas().astype(schema) for batch in batches), schema)
+
+
+def read_base64_dataset(encoded, filename, key=None):
+    """
+    Parses a base64-encoded upload, as CSV or as a columnar file depending on its name.
+    With the content key of the upload, the cached compact schema of the file is reused.
+    """
+    schema = load_schema(key)
+    fmt = columnar_format(filename)
+    if fmt is None:
+        df = read_base64_csv(encoded, schema=schema)
+    else:
+        # Columnar readers need random access (Parquet footer): the payload is decoded once
+        df = read_columnar(pa.BufferReader(base64.b64decode(encoded)), fmt, schema=schema)
+    if schema is None:
+        save_schema(key, frame_schema(df))
+    return df
+
+
+# --- COLUMNAR EXPORT ---
+
+def frame_to_columnar_bytes(df, fmt='parquet'):
+    """Serializes a DataFrame to Parquet (compressed) or Arrow IPC (zero-copy readable) bytes."""
+    table = pa.Table.from_pandas(df, preserve_index=not isinstance(df.index, pd.RangeIndex))
+    sink = pa.BufferOutputStream()
+    if fmt == 'parquet':
+        pq.write_table(table, sink, compression='zstd')
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_archive(tables, fmt='parquet'):
+    """Zip (stored, the files are already compact) of several named DataFrames in a columnar format."""
+    extension = 'parquet' if fmt == 'parquet' else 'arrow'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, df in tables.items():
+            archive.writestr(f"{name}.{extension}", frame_to_columnar_bytes(df, fmt))
+    return buffer.getvalue()
+
+
+# --- FILES ON DISK ---
+
+def iter_file_chunks(path, chunksize=INGESTION_CHUNK_ROWS, columns=None):
+    """Yields a CSV or columnar file as DataFrame chunks (raw dtypes), optionally restricted to 'columns'."""
+    fmt = columnar_format(path)
+    if fmt is None:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+        return
+    for batch in iter_record_batches(path, fmt, chunksize, columns):
+        yield batch.to_pandas()
+
+
+def file_content_key(path, block_size=1024 * 1024):
+    """Hashes a file on disk block by block (same key as an upload of that file)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_dataset_file(path, chunksize=INGESTION_CHUNK_ROWS, key=None):
+    """
+    Loads a dataset from disk: chunked CSV reader, or memory-mapped columnar reader.
+    With the content key of the file (see file_content_key), its cached compact schema is reused.
+    """
+    schema = load_schema(key)
+    fmt = columnar_format(path)
+    if fmt is None:
+        df = read_csv_chunked(path, chunksize=chunksize, schema=schema)
+    else:
+        df = read_columnar(path, fmt, batch_rows=chunksize, schema=schema)
+    if schema is None:
+        save_schema(key, frame_schema(df))
+    return df
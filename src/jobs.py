@@ -0,0 +1,202 @@
+# src/jobs.py
+import datetime
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import DATASET_CACHE, LRUCache, shared_directory
+from src.config import AUDIT_JOB_WORKERS, AUDIT_JOB_COLUMN_BATCH, AUDIT_JOB_HISTORY, AUDIT_JOB_STALE_S
+from src.pipeline import (
+    select_targets, get_column_metrics, compute_profiled_fairness, global_score, reference_in_bias_mean
+)
+from src.auditor import fairness_gap, fairness_records
+from src.profiling import PROFILER
+from src.real_profile import get_real_profile
+from src.result_store import RESULT_STORE, STORED_FIELDS, audit_method
+
+# Stages reported to the dashboard, in execution order
+JOB_STAGES = ['chargement', 'colonnes', 'equite', 'score']
+
+# Job snapshots shared by the server workers (multi-worker mode only): the worker running
+# a job publishes it there, any other worker serves it to the pollers
+SHARED_JOBS = shared_directory('jobs')
+
+
+def job_id_for(key_r, key_g, selected, approx):
+    """Identical audit requests share one job (and its results)."""
+    payload = json.dumps([key_r, key_g, sorted(selected or ['none']), bool(approx)])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class AuditJob:
+    """State of one background audit, updated by its worker and read by the pollers."""
+
+    def __init__(self, job_id, key_r, key_g, selected, approx, shared=None):
+        self.id = job_id
+        self.params = (key_r, key_g, selected, approx)
+        self.status = 'queued'
+        self.stage = None
+        self.stages = {name: 'pending' for name in JOB_STAGES}
+        self.reference = None
+        self.targets = []
+        self.columns = {}
+        self.fairness = []
+        self.fairness_gap = None
+        self.global_score = None
+        self.error = None
+        self.created = datetime.datetime.now().isoformat(timespec='seconds')
+        self._lock = threading.Lock()
+        self._shared = shared
+        self._share()
+
+    def _share(self):
+        """Publishes the new state to the other server workers."""
+        if self._shared is not None:
+            self._shared.save(self.id, self.snapshot())
+
+    def set_stage(self, name):
+        with self._lock:
+            if self.stage:
+                self.stages[self.stage] = 'done'
+            self.stage = name
+            self.stages[name] = 'running'
+        self._share()
+
+    def finish(self):
+        with self._lock:
+            if self.stage:
+                self.stages[self.stage] = 'done'
+            self.status = 'done'
+        self._share()
+
+    def restore(self, result):
+        """Completes the job at once from a stored result (see src.result_store)."""
+        with self._lock:
+            self.reference = result.get('reference')
+            self.columns = dict(result.get('columns', {}))
+            self.targets = list(self.columns)
+            self.fairness = list(result.get('fairness', []))
+            self.fairness_gap = result.get('fairness_gap')
+            self.global_score = result.get('global_score')
+            self.stages = {name: 'done' for name in JOB_STAGES}
+            self.stage = JOB_STAGES[-1]
+            self.status = 'done'
+        self._share()
+
+    def publish(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+        self._share()
+
+    def add_columns(self, metrics):
+        with self._lock:
+            self.columns = dict(self.columns, **metrics)
+        self._share()
+
+    def snapshot(self):
+        """Consistent copy of the job state, safe to serialize."""
+        with self._lock:
+            return {
+                'id': self.id, 'params': list(self.params), 'status': self.status, 'stage': self.stage, 'stages': dict(self.stages),
+                'reference': self.reference, 'targets': list(self.targets), 'columns': dict(self.columns),
+                'fairness': list(self.fairness), 'fairness_gap': self.fairness_gap,
+                'global_score': self.global_score, 'error': self.error, 'created': self.created,
+                'updated': time.time(),
+            }
+
+
+def is_live(snapshot, stale_after=AUDIT_JOB_STALE_S):
+    """False for a failed job, or for an unfinished one whose worker stopped publishing it."""
+    if snapshot['status'] == 'error':
+        return False
+    return snapshot['status'] == 'done' or time.time() - snapshot['updated'] < stale_after
+
+
+class JobManager:
+    """
+    In-process audit queue: jobs run on a small thread pool, no broker required.
+    Each job holds one worker, so up to AUDIT_JOB_WORKERS users are audited side by side
+    and further requests wait in FIFO order instead of starving each other.
+    In the multi-worker mode, a job submitted or finished by another server worker is
+    served from its shared snapshot instead of being run again; an audit finished in an
+    earlier session is served from the result store.
+    """
+
+    def __init__(self, max_workers=AUDIT_JOB_WORKERS, column_batch=AUDIT_JOB_COLUMN_BATCH, shared=SHARED_JOBS):
+        self.column_batch = max(1, column_batch)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='audit-job')
+        self._jobs = LRUCache(max_items=AUDIT_JOB_HISTORY)
+        self._shared = shared if shared is not None and shared.enabled else None
+        self._lock = threading.Lock()
+
+    def submit(self, key_r, key_g, selected, approx=False):
+        """Queues an audit and returns its id immediately (reusing an identical job)."""
+        job_id = job_id_for(key_r, key_g, selected, approx)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != 'error':
+                return job_id
+            snapshot = self._shared.load(job_id) if job is None and self._shared else None
+            if snapshot is not None and is_live(snapshot):
+                return job_id
+            job = AuditJob(job_id, key_r, key_g, selected, approx, self._shared)
+            stored = RESULT_STORE.find(key_r, key_g, selected, audit_method(approx))
+            if stored is not None:
+                job.restore(stored)
+            self._jobs.put(job_id, job)
+        if stored is None:
+            self._pool.submit(self._run, job)
+        return job_id
+
+    def get(self, job_id):
+        """Snapshot of a job, or None if unknown (expired or never submitted)."""
+        job = self._jobs.get(job_id) if job_id else None
+        if job is not None:
+            return job.snapshot()
+        snapshot = self._shared.load(job_id) if job_id and self._shared else None
+        if snapshot is not None and not is_live(snapshot) and snapshot['status'] != 'error':
+            # Its worker is gone: this worker runs it again
+            self.submit(*snapshot['params'])
+            return self.get(job_id)
+        return snapshot
+
+    def _run(self, job):
+        key_r, key_g, selected, approx = job.params
+        try:
+            with PROFILER.run('audit_job', job=job.id):
+                job.publish(status='running')
+                job.set_stage('chargement')
+                df_r, df_g = DATASET_CACHE.get(key_r), DATASET_CACHE.get(key_g)
+                # The real side is profiled once (and persisted), then every candidate reuses it
+                profile = get_real_profile(key_r, df_r)
+                if profile is None or df_g is None:
+                    raise LookupError("Session expirée : veuillez réimporter les fichiers CSV.")
+                ref_col, targets = select_targets(profile.head, df_g, selected)
+                job.publish(reference=ref_col, targets=targets)
+
+                # Columns are computed in small batches so that cards appear as they finish
+                job.set_stage('colonnes')
+                for start in range(0, len(targets), self.column_batch):
+                    batch = targets[start:start + self.column_batch]
+                    job.add_columns(get_column_metrics(key_r, key_g, df_r, df_g, ref_col, batch, approx, profile))
+
+                job.set_stage('equite')
+                matrix = compute_profiled_fairness(profile, df_g, targets)
+                gap = fairness_gap(matrix)
+
+                job.set_stage('score')
+                score = global_score(job.snapshot()['columns'], gap, reference_in_bias_mean(profile.head, df_g, ref_col))
+                job.publish(fairness=fairness_records(matrix), fairness_gap=gap, global_score=score)
+                job.finish()
+            snapshot = job.snapshot()
+            RESULT_STORE.put(key_r, key_g, selected, audit_method(approx), {f: snapshot[f] for f in STORED_FIELDS})
+        except Exception as e:
+            print(f"Audit Job Error: {e}")
+            job.publish(status='error', error=str(e))
+
+
+# Shared queue used by the Dash callbacks
+JOB_MANAGER = JobManager()
@@ -0,0 +1,182 @@
+# src/out_of_core.py
+"""
+Out-of-core audit engine, for datasets larger than RAM.
+
+Both files are streamed chunk by chunk and never loaded whole. Each chunk updates:
+- the per-reference sums and counts of the audited columns (exact df_bias),
+- the column sketches (moments, histogram, quantiles) used for skewness, entropy and KS,
+- the exact counts of the reference values, from which the outcome thresholds derive.
+A second pass accumulates the grouped counts of the fairness matrix with those thresholds.
+Memory is bounded by the chunk size and the number of distinct reference and group values.
+"""
+import pandas as pd
+
+from src.auditor import (
+    add_fairness_counts, fairness_counts, fairness_gap, fairness_matrix, fairness_records,
+    label_column, sensitive_attributes, threshold_from_counts
+)
+from src.config import EXECUTOR_KIND, INGESTION_CHUNK_ROWS
+from src.executor import parallel_map
+from src.ingestion import iter_file_chunks
+from src.pipeline import bias_from_means, global_score, reference_in_bias_mean, select_targets, sketch_statistics
+from src.profiling import PROFILER
+from src.sketches import ColumnSketch
+from fonction_des_donné import encoder_references
+
+# Rows read up front to resolve the columns and dtypes of a file
+SCHEMA_PEEK_ROWS = 1000
+
+
+# --- STREAMED ACCUMULATORS ---
+
+class ReferenceMeans:
+    """
+    Streamed groupby mean: per-reference sums and non-missing counts of the audited columns,
+    and the number of rows of every reference value.
+    """
+
+    def __init__(self):
+        self.sums = None
+        self.counts = None
+        self.sizes = None
+
+    def update(self, refs, values):
+        grouped = values.groupby(refs)
+        sums, counts, sizes = grouped.sum().astype('float64'), grouped.count(), grouped.size()
+        if self.sums is None:
+            self.sums, self.counts, self.sizes = sums, counts, sizes
+        else:
+            self.sums = self.sums.add(sums, fill_value=0)
+            self.counts = self.counts.add(counts, fill_value=0)
+            self.sizes = self.sizes.add(sizes, fill_value=0)
+
+    def means(self):
+        """Per-reference means, indexed by the raw reference values."""
+        if self.sums is None:
+            return pd.DataFrame()
+        return self.sums / self.counts
+
+
+class FileScan:
+    """Everything the audit needs from one file, accumulated chunk by chunk."""
+
+    def __init__(self, ref_col, targets, label=None):
+        self.ref_col = ref_col
+        self.targets = list(targets)
+        self.rows = 0
+        self.reference_means = ReferenceMeans()
+        # The numeric outcome column of the equalized odds is sketched too, for its threshold
+        sketched = self.targets + ([label] if label and label != ref_col else [])
+        self.sketches = {c: ColumnSketch() for c in dict.fromkeys(sketched)}
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys([self.ref_col] + list(self.sketches)))
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.reference_means.update(chunk[self.ref_col], chunk[self.targets])
+        for c, sketch in self.sketches.items():
+            sketch.update(chunk[c].to_numpy())
+        return self
+
+    def outcome_thresholds(self, numeric_ref):
+        """
+        Outcome thresholds of the fairness audit (see src.auditor.outcome_thresholds): exact for the
+        reference column and the discrete columns, from the quantile sketch for the continuous ones.
+        """
+        thresholds = {}
+        for c, sketch in self.sketches.items():
+            if sketch.value_counts is not None:
+                thresholds[c] = threshold_from_counts(pd.Series(sketch.value_counts, dtype='float64'))
+            else:
+                thresholds[c] = (float(sketch.quantiles.quantile(0.5)), False)
+        sizes = self.reference_means.sizes if self.reference_means.sizes is not None else pd.Series(dtype='float64')
+        thresholds[self.ref_col] = threshold_from_counts(sizes, numeric=numeric_ref)
+        return thresholds
+
+
+def peek_frame(path, rows=SCHEMA_PEEK_ROWS):
+    """First rows of a file, to resolve its columns and dtypes without reading it."""
+    return next(iter_file_chunks(path, chunksize=rows), pd.DataFrame())
+
+
+def scan_file(args):
+    """Streams one file into a FileScan (pool worker)."""
+    path, scan, chunksize = args
+    for chunk in iter_file_chunks(path, chunksize=chunksize, columns=scan.columns):
+        scan.update(chunk)
+    return scan
+
+
+def scan_fairness(args):
+    """Streams one file into its grouped fairness counts (pool worker, second pass)."""
+    path, label, targets, sensitive, thresholds, chunksize = args
+    total = None
+    columns = list(dict.fromkeys(targets + sensitive + ([label] if label else [])))
+    for chunk in iter_file_chunks(path, chunksize=chunksize, columns=columns):
+        total = add_fairness_counts(total, fairness_counts(chunk, targets, sensitive, label, thresholds))
+    return total or {}
+
+
+# --- AUDIT ---
+
+def run_out_of_core_audit(real_path, generated_path, selected=None, chunksize=INGESTION_CHUNK_ROWS,
+                          executor_kind=EXECUTOR_KIND, bias_table=False):
+    """
+    Out-of-core counterpart of src.pipeline.run_audit on two files (CSV, Parquet or Arrow).
+    The bias is exact; skewness, entropy and KS come from the approximate mode's sketches.
+    The columns, their dtypes and the sensitive attributes are resolved from the first rows of each
+    file; the fairness matrix takes a second pass over both files.
+    """
+    head_r, head_g = peek_frame(real_path), peek_frame(generated_path)
+    ref_col, targets = select_targets(head_r, head_g, selected or ['none'])
+    sensitive = [s for s in sensitive_attributes(head_r, exclude=[ref_col]) if s in head_g.columns]
+    # Both files are streamed by column: the outcome column must be in both, and numeric unless it
+    # is the reference (its threshold then comes from a sketch)
+    label = label_column(head_r)
+    if label is not None and (label not in head_g.columns or (
+            label != ref_col and not pd.api.types.is_numeric_dtype(head_r[label]))):
+        label = None
+    scans = [FileScan(ref_col, targets, label), FileScan(ref_col, targets, label)]
+
+    # The two files are streamed concurrently
+    with PROFILER.stage('out_of_core_scan'):
+        scan_r, scan_g = parallel_map(
+            scan_file, [(real_path, scans[0], chunksize), (generated_path, scans[1], chunksize)],
+            kind=executor_kind, max_workers=2
+        )
+
+    with PROFILER.stage('bias', rows=scan_r.rows + scan_g.rows):
+        # Per-reference means are re-indexed by the codes shared with the in-memory pipeline
+        means_r, means_g = scan_r.reference_means.means(), scan_g.reference_means.means()
+        refs_r, refs_g, categories = encoder_references(means_r.index.to_series(), means_g.index.to_series())
+        means_r.index, means_g.index = refs_r.to_numpy(), refs_g.to_numpy()
+        df_bias = bias_from_means(means_r.rename_axis('ref'), means_g.rename_axis('ref'), interpolate=categories is None)
+        columns = {
+            c: dict(bias=float(df_bias[c].mean()), **sketch_statistics(scan_r.sketches[c], scan_g.sketches[c]))
+            for c in targets
+        }
+
+    counts_r, counts_g = {}, {}
+    if sensitive:
+        thresholds = scan_r.outcome_thresholds(pd.api.types.is_numeric_dtype(head_r[ref_col]))
+        with PROFILER.stage('out_of_core_fairness'):
+            counts_r, counts_g = parallel_map(
+                scan_fairness,
+                [(path, label, targets, sensitive, thresholds, chunksize) for path in (real_path, generated_path)],
+                kind=executor_kind, max_workers=2
+            )
+    matrix = fairness_matrix(counts_r, counts_g, label)
+    gap = fairness_gap(matrix)
+    result = {
+        'reference': ref_col,
+        'columns': columns,
+        'fairness': fairness_records(matrix),
+        'fairness_gap': gap,
+        'global_score': global_score(columns, gap, reference_in_bias_mean(head_r, head_g, ref_col)),
+        'rows': {'real': scan_r.rows, 'generated': scan_g.rows},
+    }
+    if bias_table:
+        result['bias_table'] = df_bias
+    return result
@@ -4,10 +4,99 @@ import dash_bootstrap_components as dbc
 # Importing theme settings from utils
 from src.utils import THEMES_COLORS
 
-def render_admin_layout(settings):
+# Number of runs displayed in the profiling panel (the JSON export has the full history)
+PROFILE_RUNS_DISPLAYED = 10
+
+# Labels of the statistics methods stored with each audit (see src.result_store)
+METHOD_LABELS = {'exact': "Exact", 'approx': "Approximatif", 'out_of_core': "Hors mémoire"}
+
+def is_missing(value):
+    """Missing scores come back as None or NaN from the result store."""
+    return value is None or value != value
+
+def formatted(value, template):
+    return "-" if is_missing(value) else template.format(value)
+
+def render_profile_table(history, theme_key):
+    """
+    Renders the per-stage profiling history (one row per stage, most recent run first).
+    Memory shows the traced peak when enabled, otherwise the process peak RSS.
+    """
+    t = THEMES_COLORS[theme_key]
+    if not history:
+        return html.P("Aucune exécution enregistrée pour le moment.", style={'color': '#94a3b8', 'fontSize': '12px'})
+
+    rows = []
+    for run in history[:PROFILE_RUNS_DISPLAYED]:
+        for stage in run['stages']:
+            memory = stage['traced_peak_mb'] if stage['traced_peak_mb'] is not None else stage['peak_rss_mb']
+            rows.append(html.Tr([
+                html.Td(run['started']), html.Td(run['kind']), html.Td(stage['stage']),
+                html.Td(f"{stage['seconds']:.3f}"),
+                html.Td(stage['rows'] if stage['rows'] is not None else "-"),
+                html.Td(f"{memory:.1f}" if memory is not None else "-")
+            ]))
+        rows.append(html.Tr([
+            html.Td(run['started']), html.Td(run['kind']), html.Td(html.B("Total")),
+            html.Td(html.B(f"{run['total_s']:.3f}")), html.Td(""), html.Td("")
+        ]))
+
+    header = html.Thead(html.Tr([html.Th(h) for h in ["Date", "Type", "Étape", "Durée (s)", "Lignes", "Mémoire (MB)"]]))
+    return dbc.Table([header, html.Tbody(rows)], size="sm", striped=True, bordered=False,
+                     style={'color': t['texte'], 'fontSize': '12px'}, color="dark" if theme_key == "sombre" else None)
+
+def render_history_table(history, theme_key):
+    """
+    Renders the stored audits (one row per audit, most recent first). Successive generated
+    datasets audited against the same real dataset show the trend of their generator.
+    """
+    t = THEMES_COLORS[theme_key]
+    if not history:
+        return html.P("Aucun audit enregistré pour le moment.", style={'color': '#94a3b8', 'fontSize': '12px'})
+
+    # The score is a percentage, the fairness gap a 0-1 parity difference (as on the leaderboard)
+    rows = [html.Tr([
+        html.Td(audit['created']), html.Td(audit['real']), html.Td(audit['generated']),
+        html.Td(METHOD_LABELS.get(audit['method'], audit['method'])),
+        html.Td(formatted(audit['global_score'], "{:.2f}%")), html.Td(formatted(audit['fairness_gap'], "{:.4f}"))
+    ]) for audit in history]
+
+    header = html.Thead(html.Tr([html.Th(h) for h in ["Date", "Réel", "Généré", "Méthode", "Score Global", "Écart d'Équité"]]))
+    return dbc.Table([header, html.Tbody(rows)], size="sm", striped=True, bordered=False,
+                     style={'color': t['texte'], 'fontSize': '12px'}, color="dark" if theme_key == "sombre" else None)
+
+def render_trend_table(trend, theme_key):
+    """
+    Renders the candidates audited against one real dataset, oldest first, with the change
+    of the global score since the previous audit (successive generator versions).
+    """
+    t = THEMES_COLORS[theme_key]
+    if not trend:
+        return html.P("Aucun audit enregistré pour ce dataset réel.", style={'color': '#94a3b8', 'fontSize': '12px'})
+
+    rows, previous = [], None
+    for audit in trend:
+        score = audit['global_score']
+        rows.append(html.Tr([
+            html.Td(audit['created']), html.Td(audit['generated']),
+            html.Td(METHOD_LABELS.get(audit['method'], audit['method'])),
+            html.Td(formatted(score, "{:.2f}%")),
+            html.Td("-" if previous is None or is_missing(score) else f"{score - previous:+.2f}"),
+            html.Td(formatted(audit['fairness_gap'], "{:.4f}"))
+        ]))
+        if not is_missing(score):
+            previous = score
+
+    header = html.Thead(html.Tr([html.Th(h) for h in ["Date", "Généré", "Méthode", "Score Global", "Évolution", "Écart d'Équité"]]))
+    return dbc.Table([header, html.Tbody(rows)], size="sm", striped=True, bordered=False,
+                     style={'color': t['texte'], 'fontSize': '12px'}, color="dark" if theme_key == "sombre" else None)
+
+def render_admin_layout(settings, profile_history=None, audit_history=None, real_datasets=None):
     """
     Renders the Administration page.
-    Features a password lock zone and a settings panel for themes and bias thresholds.
+    Features a password lock zone, a settings panel for themes and bias thresholds,
+    the profiling history of the last uploads and audits, the stored audit results and
+    the score trend of the candidates audited against each real dataset.
     """
     tk = settings.get('theme', 'sombre')
     t = THEMES_COLORS[tk]
@@ -61,6 +150,16 @@ def render_admin_layout(settings):
                 ], width=12, lg=8)
             ], className="mt-4"),
             
+            # Approximate Statistics Mode (sketches, for very large datasets)
+            dbc.Checklist(
+                id='approx-sel',
+                options=[{'label': " Mode approximatif (statistiques par sketches, grands volumes)", 'value': 'approx'}],
+                value=['approx'] if settings.get('approx', False) else [],
+                switch=True,
+                className="mt-4",
+                style={'color': t['texte']}
+            ),
+            
             # Save Button
             dbc.Button(
                 "Enregistrer les réglages", 
@@ -68,6 +167,42 @@ def render_admin_layout(settings):
                 color="success", 
                 className="mt-5 w-100 fw-bold",
                 style={'padding': '12px'}
-            )
+            ),
+            
+            # Profiling Panel (stage timings of the last runs)
+            html.Hr(style={'borderColor': t['border'], 'marginTop': '40px'}),
+            html.Div([
+                html.Label("⏱️ Profilage des audits", style={'color': t['texte'], 'fontWeight': 'bold'}),
+                html.Div([
+                    dbc.Button("Actualiser", id="btn-profile-refresh", color="secondary", size="sm", className="me-2"),
+                    dbc.Button("Exporter JSON", id="btn-profile-export", color="info", size="sm")
+                ], className="float-end")
+            ], className="mb-3"),
+            html.Div(id="profile-table", children=render_profile_table(profile_history or [], tk)),
+            dcc.Download(id="download-profile"),
+
+            # Audit History Panel (stored results, reused by identical audits)
+            html.Hr(style={'borderColor': t['border'], 'marginTop': '40px'}),
+            html.Div([
+                html.Label("📚 Historique des audits", style={'color': t['texte'], 'fontWeight': 'bold'}),
+                html.Div([
+                    dbc.Button("Actualiser", id="btn-history-refresh", color="secondary", size="sm", className="me-2"),
+                    dbc.Button("Purger", id="btn-history-evict", color="danger", size="sm")
+                ], className="float-end")
+            ], className="mb-3"),
+            html.P("Les audits anciens ou les moins utilisés au-delà de la taille maximale sont supprimés par la purge.",
+                   style={'color': '#94a3b8', 'fontSize': '12px'}),
+            html.Div(id="history-table", children=render_history_table(audit_history or [], tk)),
+
+            # Trend Panel (candidates audited against one real dataset, filled by its callback)
+            html.Label("📈 Tendance par dataset réel", className="mt-4 mb-2", style={'color': t['texte'], 'fontWeight': 'bold'}),
+            dcc.Dropdown(
+                id='trend-real-sel',
+                options=[{'label': name, 'value': key} for key, name in real_datasets or []],
+                value=real_datasets[0][0] if real_datasets else None,
+                clearable=False,
+                style={'color': '#000'}
+            ),
+            html.Div(id="trend-table", className="mt-3")
         ])
     ])
\ No newline at end of file
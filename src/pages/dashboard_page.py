@@ -1,8 +1,44 @@
 # src/pages/dashboard_page.py
 from dash import dcc, html
 import dash_bootstrap_components as dbc
+import pandas as pd
 # Importing theme and color settings from utils
 from src.utils import THEMES_COLORS, STATUS_COLORS
+from src.config import DASHBOARD_CARDS_PER_PAGE
+
+# Refresh period (ms) of the dashboard while an audit job is running
+AUDIT_POLL_INTERVAL_MS = 700
+
+# Labels of the audit job stages (see src.jobs.JOB_STAGES)
+JOB_STAGE_LABELS = {
+    'chargement': "Chargement des données",
+    'colonnes': "Calcul des métriques par colonne",
+    'equite': "Audit d'équité",
+    'score': "Score global"
+}
+
+# Donut figure of a card, built in the browser from its {value, color, text} payload
+# (registered as a clientside callback in app.py; mirrors the former server-side go.Pie figure)
+DONUT_FIGURE_JS = """
+function(payload) {
+    if (!payload) { return window.dash_clientside.no_update; }
+    return {
+        data: [{
+            type: 'pie', values: [payload.value, Math.max(0.1, 100 - payload.value)], hole: 0.75,
+            marker: {colors: [payload.color, 'rgba(200, 200, 200, 0.2)']}, textinfo: 'none', hoverinfo: 'none',
+            sort: false
+        }],
+        layout: {
+            showlegend: false, height: 120, margin: {l: 2, r: 2, t: 2, b: 2},
+            annotations: [{
+                text: payload.value.toFixed(1) + '%', x: 0.5, y: 0.5, showarrow: false,
+                font: {size: 16, weight: 'bold', color: payload.text}
+            }],
+            paper_bgcolor: 'rgba(0,0,0,0)', plot_bgcolor: 'rgba(0,0,0,0)'
+        }
+    };
+}
+"""
 
 def render_dashboard_layout(theme_key):
     """
@@ -32,36 +68,147 @@ def render_dashboard_layout(theme_key):
                 className="d-flex align-items-center justify-content-center"
             ),
             
-            # PDF Export Button
-            dbc.Col(
+            # Export Buttons: PDF report and columnar tables (Parquet)
+            dbc.Col([
                 dbc.Button(
                     "📄 Exporter PDF", 
                     id="btn-pdf", 
                     color="info", 
                     className="mt-4 px-4 fw-bold",
                     style={'borderRadius': '10px'}
-                ), 
+                ),
+                dbc.Button(
+                    "🗂️ Exporter Parquet", 
+                    id="btn-parquet", 
+                    color="secondary", 
+                    outline=True,
+                    className="mt-4 ms-2 px-4 fw-bold",
+                    style={'borderRadius': '10px'}
+                )
+            ], 
                 width=6, lg=3, 
                 className="text-end"
             )
         ], className="align-items-center mb-4"),
 
+        # Comparison Mode: leaderboard of the generated candidates (polled while they are audited)
+        html.Div(id='leaderboard-zone', className="mb-4"),
+        dcc.Interval(id='leaderboard-poll', interval=AUDIT_POLL_INTERVAL_MS, disabled=False),
+
+        # Background Audit Progress (polled while the audit job runs)
+        html.Div(id='audit-progress', className="mb-4"),
+        dcc.Interval(id='audit-poll', interval=AUDIT_POLL_INTERVAL_MS, disabled=False),
+
         # Results Container: Individual Bias Cards
-        # This row will be dynamically filled by the update_results callback in app.py
+        # This row will be dynamically filled by the update_results callback in app.py,
+        # one page of DASHBOARD_CARDS_PER_PAGE cards at a time
         dbc.Row(
             id='individual-bias-cards', 
-            className="g-4 pb-5"
+            className="g-4"
         ), 
+        html.Div(
+            dbc.Pagination(id='cards-pagination', max_value=1, active_page=1, fully_expanded=False),
+            id='cards-pagination-zone', className="d-flex justify-content-center pb-5"
+        ),
         
     ], fluid=True)
 
+def create_progress_bar(job, theme_key):
+    """
+    Progress of a running audit job: current stage and number of columns already computed.
+    """
+    t = THEMES_COLORS[theme_key]
+    alia_color = STATUS_COLORS[theme_key]["alia"]
+    total = len(job['targets'])
+    done = len(job['columns'])
+    percent = int(100 * done / total) if total else 0
+    stage = JOB_STAGE_LABELS.get(job['stage'], "En attente d'un worker")
+    
+    return html.Div([
+        html.Small(f"⏳ {stage} — {done}/{total} colonnes", style={'color': t['texte']}),
+        dbc.Progress(value=percent, striped=True, animated=True, color=alia_color,
+                     className="mt-1", style={'height': '8px'})
+    ])
+
+def create_leaderboard(board, pending, theme_key):
+    """
+    Ranked comparison of the generated candidates, best global score first.
+    'board' comes from src.pipeline.leaderboard; 'pending' lists the (name, state) of the
+    candidates whose audit is not finished yet.
+    """
+    t = THEMES_COLORS[theme_key]
+    alia_color = STATUS_COLORS[theme_key]["alia"]
+    
+    header = html.Thead(html.Tr([
+        html.Th(h) for h in ["#", "Candidat", "Score Global", "Biais Moyen", "Écart d'Équité", "Colonne la plus biaisée"]
+    ]))
+    rows = []
+    for r in board.to_dict('records'):
+        worst = r['worst_column']
+        rows.append(html.Tr([
+            html.Td(r['rank']),
+            html.Td(r['candidate'], className="fw-bold"),
+            html.Td(f"{r['global_score']}%", style={'color': alia_color, 'fontWeight': 'bold'}),
+            html.Td(f"{r['mean_bias']:.2f}%"),
+            html.Td("N/A" if pd.isna(r['fairness_gap']) else f"{r['fairness_gap']:.4f}"),
+            html.Td(f"{worst} ({r['bias_' + worst]:.1f}%)" if worst else "N/A")
+        ]))
+    rows += [
+        html.Tr([html.Td("…"), html.Td(name), html.Td(state, colSpan=4, style={'color': '#94a3b8'})])
+        for name, state in pending
+    ]
+    
+    return html.Div([
+        dbc.Row([
+            dbc.Col(html.H5("🏆 Classement des Candidats", className="fw-bold m-0", style={'color': t['texte']})),
+            dbc.Col(
+                dbc.Button("⬇️ Exporter le classement", id="btn-leaderboard-export", color="secondary",
+                           outline=True, size="sm", disabled=board.empty),
+                className="text-end"
+            )
+        ], className="align-items-center mb-3"),
+        dbc.Table(
+            [header, html.Tbody(rows)], hover=True, responsive=True, className="mb-0",
+            style={'--bs-table-bg': 'transparent', '--bs-table-color': t['texte'], 'color': t['texte']}
+        )
+    ], className="p-3", style={'backgroundColor': t['card'], 'borderRadius': '15px', 'border': f'1px solid {t["border"]}'})
+
+def create_fairness_panel(fairness, theme_key, max_rows=10):
+    """
+    Collapsible view of the fairness matrix: the (target, sensitive attribute) pairs whose
+    demographic parity drifts most between the real and the generated data.
+    """
+    t = THEMES_COLORS[theme_key]
+    if not fairness:
+        return ""
+    worst = sorted(fairness, key=lambda r: -1 if r['dp_gap'] is None else r['dp_gap'], reverse=True)[:max_rows]
+    fmt = lambda v: "N/A" if v is None else f"{v:.3f}"
+    # Equalized odds are conditioned on the outcome column of the real data (N/A without one)
+    label = fairness[0].get('label')
+    header = html.Thead(html.Tr([
+        html.Th(h) for h in ["Cible", "Attribut Sensible", "Parité Réel", "Parité Généré", "Écart Parité",
+                             f"Écart Odds ({label or 'sans label'})", "Groupe le plus biaisé"]
+    ]))
+    rows = [html.Tr([
+        html.Td(r['target']), html.Td(r['sensitive']), html.Td(fmt(r['dp_real'])), html.Td(fmt(r['dp_gen'])),
+        html.Td(fmt(r['dp_gap']), className="fw-bold"), html.Td(fmt(r['eo_gap'])),
+        html.Td(f"{r['worst_group']} ({fmt(r['group_bias'])})" if r['worst_group'] is not None else "N/A")
+    ]) for r in worst]
+    
+    return dbc.Accordion([
+        dbc.AccordionItem(
+            dbc.Table([header, html.Tbody(rows)], hover=True, responsive=True, size="sm", className="mb-0",
+                      style={'--bs-table-bg': 'transparent', '--bs-table-color': t['texte'], 'color': t['texte']}),
+            title=f"⚖️ Matrice d'Équité — {len(worst)} paires les plus dégradées sur {len(fairness)}"
+        )
+    ], start_collapsed=True)
+
 def create_individual_card(var_name, bias_value, status, color, theme_key, metrics):
     """
     Helper function to maintain the 'Old Look' card style.
     This structure is used within the app.py callback to generate result cards.
     """
     t = THEMES_COLORS[theme_key]
-    alia_color = STATUS_COLORS[theme_key]["alia"]
     
     return dbc.Col(
         html.Div(style={
@@ -89,8 +236,11 @@ def create_individual_card(var_name, bias_value, status, color, theme_key, metri
                 style={'color': t['texte'], 'fontSize': '1.1rem', 'display': 'block', 'marginBottom': '10px'}
             ),
             
-            # Donut Chart Placeholder (Actual graph is created in app.py)
-            html.Div(id={'type': 'donut-chart', 'index': var_name}),
+            # Donut Chart: only its numeric payload is sent, the figure is built client-side
+            dcc.Store(id={'type': 'donut-data', 'index': var_name},
+                      data={'value': bias_value, 'color': color, 'text': t['texte']}),
+            dcc.Graph(id={'type': 'donut-chart', 'index': var_name}, config={'displayModeBar': False},
+                      style={'height': '120px'}),
             
             # Summary Metrics (Skewness & Entropy)
             html.Div([
@@ -101,18 +251,32 @@ def create_individual_card(var_name, bias_value, status, color, theme_key, metri
                 ),
             ], className="mb-2"),
 
-            # Technical Details Accordion
+            # Technical Details Accordion (filled by a callback in app.py when expanded)
             dbc.Accordion([
-                dbc.AccordionItem(title="🔍 Détails Techniques", children=[
-                    html.Div(style={'padding': '10px', 'textAlign': 'left'}, children=[
-                        html.P(f"P-Value (KS Test): {metrics['p_value']:.4f}", style={'fontSize': '12px', 'color': t['texte']}),
-                        html.P(
-                            f"Recommandation: {metrics['recommendation']}", 
-                            style={'fontSize': '12px', 'color': alia_color, 'fontWeight': 'bold'}
-                        )
-                    ])
-                ])
-            ], start_collapsed=True, flush=True)
+                dbc.AccordionItem(
+                    html.Div(id={'type': 'card-details-body', 'index': var_name}),
+                    title="🔍 Détails Techniques", item_id="details"
+                )
+            ], id={'type': 'card-details', 'index': var_name}, start_collapsed=True, flush=True)
         ]),
         width=12, md=6, lg=4, className="mb-4"
-    )
\ No newline at end of file
+    )
+
+def create_card_details(metrics, theme_key):
+    """Content of the technical details of a card, rendered on first expand."""
+    t = THEMES_COLORS[theme_key]
+    alia_color = STATUS_COLORS[theme_key]["alia"]
+    
+    return html.Div(style={'padding': '10px', 'textAlign': 'left'}, children=[
+        html.P(f"P-Value (KS Test): {metrics['p_value']:.4f}", style={'fontSize': '12px', 'color': t['texte']}),
+        html.P(
+            f"Recommandation: {metrics['recommendation']}", 
+            style={'fontSize': '12px', 'color': alia_color, 'fontWeight': 'bold'}
+        )
+    ])
+
+def page_of_cards(targets, active_page, per_page=DASHBOARD_CARDS_PER_PAGE):
+    """(columns of the active page, number of pages), the page being clamped to the valid range."""
+    pages = max(1, -(-len(targets) // per_page))
+    page = min(max(active_page or 1, 1), pages)
+    return targets[(page - 1) * per_page:page * per_page], pages
\ No newline at end of file
@@ -22,7 +22,7 @@ def render_import_layout(theme_key):
                 html.Label("📂 Fichier Réel (Source)", className="fw-bold", style={'color': t['texte']}),
                 dcc.Upload(
                     id='upload-reel', 
-                    children=html.Div(id='content-reel', children="Glisser CSV", style={'color': t['texte']}), 
+                    children=html.Div(id='content-reel', children="Glisser CSV / Parquet", style={'color': t['texte']}), 
                     style={
                         'border': f'2px dashed {t["border"]}', 
                         'padding': '30px', 
@@ -36,7 +36,7 @@ def render_import_layout(theme_key):
                 html.Label("📂 Fichier Généré (IA)", className="fw-bold", style={'color': t['texte']}),
                 dcc.Upload(
                     id='upload-genere', 
-                    children=html.Div(id='content-genere', children="Glisser CSV", style={'color': t['texte']}),
+                    children=html.Div(id='content-genere', children="Glisser CSV / Parquet", style={'color': t['texte']}),
                     style={
                         'border': f'2px dashed {t["border"]}', 
                         'padding': '30px', 
@@ -47,6 +47,25 @@ def render_import_layout(theme_key):
                 )
             ], width=6),
         ], className="mt-4"),
+
+        # Comparison Mode: several generated candidates ranked against the same real file
+        dbc.Row([
+            dbc.Col([
+                html.Label("📂 Candidats à comparer (plusieurs fichiers générés)", className="fw-bold", style={'color': t['texte']}),
+                dcc.Upload(
+                    id='upload-candidats', 
+                    multiple=True,
+                    children=html.Div(id='content-candidats', children="Glisser plusieurs CSV / Parquet", style={'color': t['texte']}),
+                    style={
+                        'border': f'2px dashed {t["border"]}', 
+                        'padding': '20px', 
+                        'textAlign': 'center', 
+                        'backgroundColor': t['card'], 
+                        'borderRadius': '10px'
+                    }
+                )
+            ], width=12),
+        ], className="mt-4"),
         
         # Dynamic Menu for column selection (Populated via callback in app.py)
         html.Div(
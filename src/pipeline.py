@@ -0,0 +1,315 @@
+# src/pipeline.py
+import pandas as pd
+
+from src.auditor import fairness_counts, fairness_gap, fairness_matrix, fairness_records, run_fairness_audit
+from src.cache import LRUCache
+from src.config import METRICS_CACHE_MAX_ITEMS, SKETCH_CACHE_MAX_ITEMS, EXECUTOR_KIND, PARALLEL_MIN_ROWS
+from src.executor import parallel_map
+from src.profiling import PROFILER
+from src.sketches import ColumnSketch, sketch_ks_2samp
+from src.utils import calculate_skewness, calculate_entropy, calculate_global_score
+from fonction_des_donné import calcul_ratio_batch, encoder_references, moyennes_ponderees
+
+# Per-column metrics memoized by (real key, generated key, reference column, column, approx)
+METRICS_CACHE = LRUCache(max_items=METRICS_CACHE_MAX_ITEMS)
+
+# Column sketches of the approximate mode, memoized by (dataset key, column)
+SKETCH_CACHE = LRUCache(max_items=SKETCH_CACHE_MAX_ITEMS)
+
+
+# --- TARGET SELECTION ---
+
+def select_targets(df_r, df_g, selected):
+    """
+    Returns the reference column (first real column) and the numeric columns to audit,
+    restricted to the user selection unless it contains 'none'.
+    """
+    ref_col = df_r.columns[0]
+    num_cols = df_r.select_dtypes(include=['number']).columns
+    targets = [c for c in num_cols if c in df_g.columns and c != ref_col]
+    if selected and 'none' not in selected:
+        targets = [c for c in targets if c in selected]
+    return ref_col, targets
+
+
+# --- PER-COLUMN METRICS ---
+
+def compute_bias_scores(df_r, df_g, ref_col, targets):
+    """Mean relative gap (%) between real and generated per-reference means, per column."""
+    return compute_bias_table(df_r, df_g, ref_col, targets)[targets].mean()
+
+
+def compute_bias_table(df_r, df_g, ref_col, targets):
+    """Relative gap (%) between real and generated means, per generated reference value (df_bias)."""
+    # Shared reference codes: the frames are grouped in place, without a copy with a 'ref' column
+    with PROFILER.stage('encodage_references', rows=len(df_r) + len(df_g)):
+        ref_r, ref_g, categories = encoder_references(df_r[ref_col], df_g[ref_col])
+    with PROFILER.stage('groupby_means', rows=len(df_r) + len(df_g)):
+        df_m_r = df_r.groupby(ref_r)[targets].mean().rename_axis('ref')
+        df_m_g = df_g.groupby(ref_g)[targets].mean().rename_axis('ref')
+
+    with PROFILER.stage('bias', rows=len(df_m_g)):
+        return bias_from_means(df_m_r, df_m_g, interpolate=categories is None)
+
+
+def interpolated_means(df_m_r, refs):
+    """
+    Real per-reference means at arbitrary reference values, in one vectorized pass over the sorted
+    real references: the exact match when there is one, otherwise the two sorted neighbours weighted
+    by inverse distance (the rules of selection_valeur_ref_gen + calcul_ratio, see biais_par_reference).
+    """
+    if not df_m_r.index.is_monotonic_increasing:
+        df_m_r = df_m_r.sort_index()
+    indices, weights = calcul_ratio_batch(refs, df_m_r.index.to_numpy(dtype='float64'))
+    return moyennes_ponderees(df_m_r, indices, weights).set_axis(refs)
+
+
+def bias_from_means(df_m_r, df_m_g, interpolate=False):
+    """
+    Dashboard bias formula on per-reference means (index 'ref').
+    With interpolate=True (numeric reference), every generated reference is compared with the
+    interpolated real means; otherwise only the references shared by both datasets are kept.
+    """
+    if interpolate:
+        real, gen = interpolated_means(df_m_r, df_m_g.index), df_m_g
+    else:
+        common = df_m_r.index.intersection(df_m_g.index)
+        real, gen = df_m_r.loc[common], df_m_g.loc[common]
+    return ((gen - real).abs() / real.replace(0, 1).abs()) * 100
+
+
+def column_statistics(values):
+    """
+    Distribution statistics of one column (pool worker).
+    'values' is a (real array, generated array) pair so that it pickles cheaply.
+    """
+    from scipy.stats import ks_2samp
+
+    real, gen = pd.Series(values[0]), pd.Series(values[1])
+    return {
+        'skewness': calculate_skewness(real),
+        'entropy': calculate_entropy(real),
+        'p_value': float(ks_2samp(real.dropna(), gen.dropna())[1]),
+    }
+
+
+def build_sketch(values):
+    """Sketch of one column (pool worker)."""
+    return ColumnSketch.from_values(values)
+
+
+def get_column_sketches(key, df, columns, kind='serial'):
+    """
+    Sketches of the requested columns, built once per (dataset key, column) and reused
+    by every later audit of that dataset. Nothing is memoized when 'key' is None.
+    """
+    missing = [c for c in columns if key is None or (key, c) not in SKETCH_CACHE]
+    built = dict(zip(missing, parallel_map(build_sketch, (df[c].to_numpy() for c in missing), kind=kind)))
+    if key is not None:
+        for c, sketch in built.items():
+            SKETCH_CACHE.put((key, c), sketch)
+    return [built[c] if c in built else SKETCH_CACHE.get((key, c)) for c in columns]
+
+
+def sketch_statistics(real, gen):
+    """Approximate counterpart of column_statistics, read from two column sketches."""
+    return {
+        'skewness': real.skewness,
+        'entropy': real.entropy(),
+        'p_value': sketch_ks_2samp(real, gen)[1],
+    }
+
+
+def compute_column_metrics(df_r, df_g, ref_col, targets, executor_kind=None, approx=False, keys=(None, None)):
+    """
+    Computes bias, skewness, entropy and KS p-value for each target column.
+    'executor_kind' forces the pool used for the statistics (see src.executor).
+    With 'approx', the statistics come from bounded-memory sketches (see src.sketches),
+    reused across audits for datasets identified by 'keys'.
+    """
+    if not targets:
+        return {}
+    bias_scores = compute_bias_scores(df_r, df_g, ref_col, targets)
+
+    # Per-column statistics are independent: fan them out when the columns are large enough
+    kind = executor_kind
+    if kind is None:
+        kind = EXECUTOR_KIND if max(len(df_r), len(df_g)) >= PARALLEL_MIN_ROWS else 'serial'
+    if approx:
+        with PROFILER.stage('sketches', rows=len(df_r) + len(df_g)):
+            sketches_r = get_column_sketches(keys[0], df_r, targets, kind)
+            sketches_g = get_column_sketches(keys[1], df_g, targets, kind)
+            statistics = [sketch_statistics(r, g) for r, g in zip(sketches_r, sketches_g)]
+    else:
+        with PROFILER.stage('ks_skewness_entropy', rows=len(df_r) + len(df_g)):
+            statistics = parallel_map(
+                column_statistics,
+                ((df_r[c].to_numpy(), df_g[c].to_numpy()) for c in targets),
+                kind=kind
+            )
+    return {
+        c: dict(bias=float(bias_scores[c]), **stats)
+        for c, stats in zip(targets, statistics)
+    }
+
+
+def get_column_metrics(key_r, key_g, df_r, df_g, ref_col, targets, approx=False, profile=None):
+    """
+    Memoized version of compute_column_metrics.
+    Only the columns never audited for this dataset pair are computed, against the
+    real-data profile when one is given (df_r is then not read).
+    """
+    cache_keys = {c: (key_r, key_g, ref_col, c, approx) for c in targets}
+    missing = [c for c in targets if cache_keys[c] not in METRICS_CACHE]
+    if profile is not None:
+        computed = compute_profiled_metrics(profile, df_g, missing, approx=approx, key_g=key_g)
+    else:
+        computed = compute_column_metrics(df_r, df_g, ref_col, missing, approx=approx, keys=(key_r, key_g))
+    for c, metrics in computed.items():
+        METRICS_CACHE.put(cache_keys[c], metrics)
+    return {c: METRICS_CACHE.get(cache_keys[c]) for c in targets}
+
+
+# --- METRICS AGAINST A REAL-DATA PROFILE (see src.real_profile) ---
+
+def compute_profiled_bias_table(profile, df_g, targets):
+    """compute_bias_table with the real per-reference means read from the profile."""
+    with PROFILER.stage('encodage_references', rows=len(df_g)):
+        ref_r, ref_g, categories = encoder_references(profile.means.index.to_series(), df_g[profile.ref_col])
+    with PROFILER.stage('groupby_means', rows=len(df_g)):
+        df_m_r = profile.means[targets].set_axis(ref_r.to_numpy()).rename_axis('ref')
+        df_m_g = df_g.groupby(ref_g)[targets].mean().rename_axis('ref')
+    with PROFILER.stage('bias', rows=len(df_m_g)):
+        return bias_from_means(df_m_r, df_m_g, interpolate=categories is None)
+
+
+def generated_statistics(values):
+    """KS p-value of one generated column against the sorted real values (pool worker)."""
+    from scipy.stats import ks_2samp
+
+    real_sorted, gen = values
+    gen = gen[~pd.isna(gen)]
+    return {'p_value': float(ks_2samp(real_sorted, gen)[1])}
+
+
+def compute_profiled_metrics(profile, df_g, targets, executor_kind=None, approx=False, key_g=None):
+    """
+    compute_column_metrics against a real-data profile: only the generated side is processed,
+    the real skewness, entropy, sorted values and sketches come from the profile.
+    """
+    if not targets:
+        return {}
+    bias_scores = compute_profiled_bias_table(profile, df_g, targets)[targets].mean()
+
+    kind = executor_kind
+    if kind is None:
+        kind = EXECUTOR_KIND if max(profile.rows, len(df_g)) >= PARALLEL_MIN_ROWS else 'serial'
+    if approx:
+        with PROFILER.stage('sketches', rows=len(df_g)):
+            sketches_g = get_column_sketches(key_g, df_g, targets, kind)
+            statistics = [
+                sketch_statistics(r, g) for r, g in zip(profile.column_sketches(targets), sketches_g)
+            ]
+    else:
+        with PROFILER.stage('ks_skewness_entropy', rows=len(df_g)):
+            p_values = parallel_map(
+                generated_statistics,
+                ((profile.sorted_values[c], df_g[c].to_numpy()) for c in targets),
+                kind=kind
+            )
+            statistics = [dict(profile.statistics[c], **p) for c, p in zip(targets, p_values)]
+    return {
+        c: dict(bias=float(bias_scores[c]), **stats)
+        for c, stats in zip(targets, statistics)
+    }
+
+
+# --- FAIRNESS & GLOBAL SCORE ---
+
+def compute_fairness(df_r, df_g, ref_col, targets):
+    """Fairness matrix of every (target, sensitive attribute) pair (see src.auditor)."""
+    with PROFILER.stage('fairness_audit', rows=len(df_r) + len(df_g)):
+        return run_fairness_audit(df_r, df_g, ref_col, targets)
+
+
+def compute_profiled_fairness(profile, df_g, targets):
+    """compute_fairness with the real-side counts read from a real-data profile."""
+    with PROFILER.stage('fairness_audit', rows=len(df_g)):
+        sensitive = [s for s in profile.sensitive if s in df_g.columns]
+        counts_r = {s: (sums[targets], n[targets]) for s, (sums, n) in profile.fairness_counts.items() if s in sensitive}
+        counts_g = fairness_counts(df_g, targets, sensitive, profile.label, profile.thresholds)
+        return fairness_matrix(counts_r, counts_g, profile.label)
+
+
+def reference_in_bias_mean(df_r, df_g, ref_col):
+    """
+    A numeric reference column goes through the per-reference means too (with a null bias),
+    and has always been part of the averaged bias.
+    """
+    return all(pd.api.types.is_numeric_dtype(df[ref_col]) for df in (df_r, df_g))
+
+
+def global_score(column_metrics, fairness=None, include_reference=False):
+    """Global fidelity score of an audit from its per-column metrics and its fairness gap."""
+    biases = [m['bias'] for m in column_metrics.values()] + ([0.0] if include_reference else [])
+    mean_bias = pd.Series(biases, dtype=float).mean()
+    return calculate_global_score(mean_bias, 0.5, fairness)
+
+
+# --- FULL AUDIT ---
+
+def run_audit(df_r, df_g, selected=None, executor_kind=None, approx=False):
+    """
+    Runs the whole dashboard audit on a (real, generated) pair, without any caching.
+    Returns a JSON-serializable dict.
+    """
+    ref_col, targets = select_targets(df_r, df_g, selected or ['none'])
+    column_metrics = compute_column_metrics(df_r, df_g, ref_col, targets, executor_kind=executor_kind, approx=approx)
+    matrix = compute_fairness(df_r, df_g, ref_col, targets)
+    return {
+        'reference': ref_col,
+        'columns': column_metrics,
+        'fairness': fairness_records(matrix),
+        'fairness_gap': fairness_gap(matrix),
+        'global_score': global_score(column_metrics, fairness_gap(matrix), reference_in_bias_mean(df_r, df_g, ref_col)),
+    }
+
+
+def run_profiled_audit(profile, df_g, selected=None, executor_kind=None, approx=False):
+    """run_audit of a generated dataset against a real-data profile, without the real dataset."""
+    ref_col, targets = select_targets(profile.head, df_g, selected or ['none'])
+    column_metrics = compute_profiled_metrics(profile, df_g, targets, executor_kind=executor_kind, approx=approx)
+    matrix = compute_profiled_fairness(profile, df_g, targets)
+    return {
+        'reference': ref_col,
+        'columns': column_metrics,
+        'fairness': fairness_records(matrix),
+        'fairness_gap': fairness_gap(matrix),
+        'global_score': global_score(
+            column_metrics, fairness_gap(matrix), reference_in_bias_mean(profile.head, df_g, ref_col)
+        ),
+    }
+
+
+# --- CANDIDATE COMPARISON ---
+
+def leaderboard(audits):
+    """
+    Ranks several generated candidates audited against the same real dataset.
+    'audits' maps a candidate name to its audit (as returned by run_audit); the best global
+    score comes first, followed by the mean bias, the fairness gap and the bias of every column.
+    """
+    rows = []
+    for name, audit in audits.items():
+        biases = {c: m['bias'] for c, m in audit['columns'].items()}
+        rows.append(dict(
+            candidate=name, global_score=audit['global_score'], fairness_gap=audit['fairness_gap'],
+            mean_bias=pd.Series(biases, dtype=float).mean(),
+            worst_column=max(biases, key=biases.get) if biases else None,
+            **{f"bias_{c}": b for c, b in biases.items()}
+        ))
+    if not rows:
+        return pd.DataFrame(columns=['rank', 'candidate', 'global_score', 'fairness_gap', 'mean_bias', 'worst_column'])
+    board = pd.DataFrame(rows).sort_values(['global_score', 'mean_bias'], ascending=[False, True], kind='stable')
+    board.insert(0, 'rank', range(1, len(board) + 1))
+    return board.reset_index(drop=True)
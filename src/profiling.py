@@ -0,0 +1,123 @@
+# src/profiling.py
+import contextvars
+import datetime
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+from src.config import PROFILE_HISTORY_SIZE, PROFILE_TRACE_MEMORY
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Run being recorded by the current callback (each Dash request has its own context)
+_CURRENT_RUN = contextvars.ContextVar('current_profile_run', default=None)
+
+
+def peak_rss_mb():
+    """Peak resident memory of the process in MB, when the platform exposes it."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class ProfileRun:
+    """Stages recorded during one upload or audit."""
+
+    def __init__(self, kind, info):
+        self.kind = kind
+        self.info = info
+        self.started = datetime.datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+        self.total_s = None
+
+    def add(self, name, seconds, rows=None, traced_peak_mb=None):
+        self.stages.append({
+            'stage': name, 'seconds': round(seconds, 6), 'rows': rows,
+            'traced_peak_mb': traced_peak_mb, 'peak_rss_mb': peak_rss_mb(),
+        })
+
+    def to_dict(self):
+        return {'kind': self.kind, 'started': self.started, 'total_s': self.total_s,
+                'info': self.info, 'stages': self.stages}
+
+
+class AuditProfiler:
+    """
+    Records wall time, row count and memory of every audit stage.
+    Keeps a rolling history of the last runs for the admin page.
+    """
+
+    def __init__(self, history_size=PROFILE_HISTORY_SIZE, trace_memory=PROFILE_TRACE_MEMORY):
+        self.history = deque(maxlen=history_size)
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def run(self, kind, **info):
+        """Opens a run; stages recorded in this context are attached to it."""
+        current = ProfileRun(kind, info)
+        token = _CURRENT_RUN.set(current)
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            current.total_s = round(time.perf_counter() - start, 6)
+            _CURRENT_RUN.reset(token)
+            with self._lock:
+                self.history.append(current)
+
+    def profiled(self, kind):
+        """Decorator recording every call of a function as a run."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.run(kind, function=func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Times one stage of the current run (no-op outside of a run)."""
+        current = _CURRENT_RUN.get()
+        if current is None:
+            yield
+            return
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            traced = None
+            if self.trace_memory and tracemalloc.is_tracing():
+                traced = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 3)
+            current.add(name, seconds, rows, traced)
+
+    def snapshot(self):
+        """History as plain dicts, most recent run first."""
+        with self._lock:
+            return [r.to_dict() for r in reversed(self.history)]
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def clear(self):
+        with self._lock:
+            self.history.clear()
+
+
+# Shared instance used by the callbacks and the pipeline
+PROFILER = AuditProfiler()
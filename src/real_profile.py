@@ -0,0 +1,139 @@
+# src/real_profile.py
+"""
+Real-data profile.
+
+The real dataset is the fixed baseline of every audit. Everything the audit needs from it
+(per-reference means, sorted values for KS, skewness and entropy, fairness scores,
+column sketches) is computed once, persisted under CACHE_DIR by dataset hash and
+reused: auditing another generated candidate then only processes the generated side.
+"""
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+
+from src.auditor import fairness_counts, label_column, outcome_thresholds, sensitive_attributes
+from src.cache import LRUCache
+from src.config import CACHE_DIR, REAL_PROFILE_CACHE_ITEMS, REAL_PROFILE_CACHE_MB
+from src.profiling import PROFILER
+from src.sketches import ColumnSketch
+from src.utils import calculate_skewness, calculate_entropy
+
+# Bumped whenever the content of RealProfile changes: older files are rebuilt
+PROFILE_FORMAT_VERSION = 4
+
+
+class RealProfile:
+    """Precomputed real side of the audit, for every numeric column of the real dataset."""
+
+    def __init__(self, key, df_r):
+        self.version = PROFILE_FORMAT_VERSION
+        self.key = key
+        self.rows = len(df_r)
+        # Empty frame with the real schema: target selection and dtype checks run on it as on df_r
+        self.head = df_r.iloc[:0].copy()
+        self.ref_col = df_r.columns[0]
+        self.columns = [c for c in df_r.select_dtypes(include=['number']).columns if c != self.ref_col]
+
+        # Per-reference means, indexed by the raw reference values
+        self.means = df_r.groupby(df_r[self.ref_col], observed=True)[self.columns].mean()
+        self.sorted_values = {c: np.sort(df_r[c].dropna().to_numpy()) for c in self.columns}
+        self.statistics = {
+            c: {'skewness': calculate_skewness(df_r[c]), 'entropy': calculate_entropy(df_r[c])}
+            for c in self.columns
+        }
+
+        # Real side of the fairness matrix (see src.auditor): outcome thresholds and grouped counts,
+        # conditioned on the outcome column of the equalized odds when the dataset has one
+        self.sensitive = sensitive_attributes(df_r, exclude=[self.ref_col])
+        self.label = label_column(df_r)
+        self.thresholds = outcome_thresholds(df_r, list(dict.fromkeys(self.columns + ([self.label] if self.label else []))))
+        self.fairness_counts = fairness_counts(df_r, self.columns, self.sensitive, self.label, self.thresholds)
+        # Sketches of the approximate mode, derived from the sorted values on first use.
+        # The dict is replaced, never mutated, so a concurrent save always pickles a complete one
+        self.sketches = {}
+
+    @property
+    def nbytes(self):
+        return sum(v.nbytes for v in self.sorted_values.values()) + int(self.means.memory_usage(deep=True).sum())
+
+    def column_sketches(self, columns):
+        """Sketches of the requested columns; new ones are persisted with the profile."""
+        sketches = self.sketches
+        missing = {c: ColumnSketch.from_values(self.sorted_values[c]) for c in columns if c not in sketches}
+        if missing:
+            # Audits of the same profile run side by side: sketches built by another thread are kept
+            with _SKETCH_LOCK:
+                self.sketches = dict(missing, **self.sketches)
+                save_real_profile(self)
+        return [self.sketches[c] for c in columns]
+
+
+# Profiles loaded or built by this process
+REAL_PROFILES = LRUCache(
+    max_items=REAL_PROFILE_CACHE_ITEMS, max_bytes=REAL_PROFILE_CACHE_MB * 1024 ** 2, sizeof=lambda p: p.nbytes
+)
+
+# Candidates audited side by side against a new real dataset wait for a single build
+_BUILD_LOCK = threading.Lock()
+
+# Serializes the sketch updates of the shared profiles and their saves
+_SKETCH_LOCK = threading.Lock()
+
+
+# --- PERSISTENCE ---
+
+def profile_path(key):
+    return os.path.join(CACHE_DIR, 'real_profiles', f"{key}.pkl")
+
+
+def save_real_profile(profile):
+    """Writes a profile atomically under CACHE_DIR (no-op when persistence is disabled)."""
+    if not CACHE_DIR:
+        return
+    path = profile_path(profile.key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(profile, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Real Profile Save Error: {e}")
+
+
+def load_real_profile(key):
+    """Profile of the real dataset 'key' from memory or disk, None if it was never built."""
+    profile = REAL_PROFILES.get(key)
+    if profile is not None or not CACHE_DIR or not os.path.exists(profile_path(key)):
+        return profile
+    try:
+        with open(profile_path(key), 'rb') as f:
+            profile = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        print(f"Real Profile Load Error: {e}")
+        return None
+    if getattr(profile, 'version', None) != PROFILE_FORMAT_VERSION:
+        return None
+    REAL_PROFILES.put(key, profile)
+    return profile
+
+
+def get_real_profile(key, df_r=None):
+    """
+    Profile of the real dataset 'key': loaded if it exists, otherwise built from df_r and saved.
+    Returns None when it does not exist and df_r is not available.
+    """
+    profile = load_real_profile(key)
+    if profile is not None or df_r is None:
+        return profile
+    with _BUILD_LOCK:
+        profile = load_real_profile(key)
+        if profile is None:
+            with PROFILER.stage('real_profile', rows=len(df_r)):
+                profile = RealProfile(key, df_r)
+            save_real_profile(profile)
+            REAL_PROFILES.put(key, profile)
+    return profile
@@ -1,12 +1,32 @@
 from fpdf import FPDF
 import datetime
 
+# Column layout of the metrics table: (header, width in mm)
+METRIC_COLUMNS = [
+    ("Variable", 60), ("Mean Bias", 25), ("Status", 25),
+    ("Entropy", 25), ("Skewness", 25), ("P-Value (KS)", 30)
+]
+
+# Column layout of the fairness table, and number of (target, attribute) pairs listed
+FAIRNESS_COLUMNS = [
+    ("Target", 40), ("Sensitive", 35), ("DP Real", 22), ("DP Gen", 22),
+    ("DP Gap", 22), ("EO Gap", 22), ("Worst Group", 27)
+]
+FAIRNESS_ROWS_REPORTED = 20
+
+def latin1(text):
+    """FPDF core fonts are latin-1 only: unsupported characters are replaced."""
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
 class BiasReport(FPDF):
     def header(self):
         """Custom PDF Header with Logo/Title."""
         self.set_font('Arial', 'B', 15)
         self.cell(0, 10, 'Alia Bias Auditor - Technical Audit Report', 0, 1, 'C')
         self.ln(5)
+        # Repeat the header of the running table on every page
+        if getattr(self, 'table_columns', None):
+            self.add_table_header(self.table_columns)
 
     def add_metric_card(self, var_name, bias, status, entropy, skewness):
         """Adds a structured data block for each variable in the PDF."""
@@ -19,12 +39,52 @@ class BiasReport(FPDF):
         self.cell(0, 6, f" - Skewness: {skewness:.4f}", ln=True)
         self.ln(5)
 
-def generate_pdf_bytes(targets_data):
+    def add_table_header(self, columns=METRIC_COLUMNS):
+        """Header row of a table (the metrics table by default)."""
+        self.set_font('Arial', 'B', 9)
+        self.set_fill_color(216, 98, 122)
+        self.set_text_color(255, 255, 255)
+        for title, width in columns:
+            self.cell(width, 7, title, 1, 0, 'C', True)
+        self.ln()
+        self.set_text_color(0, 0, 0)
+        self.set_font('Arial', '', 9)
+
+    def add_metric_row(self, data):
+        """One compact table row per variable (keeps reports short for hundreds of columns)."""
+        p_value = data.get('p_value')
+        values = [
+            latin1(data['name'])[:34], f"{data['bias']:.2f}%", data['status'],
+            f"{data['entropy']:.4f}", f"{data['skewness']:.4f}",
+            f"{p_value:.4f}" if p_value is not None else "-"
+        ]
+        self.add_row(values, METRIC_COLUMNS)
+
+    def add_fairness_row(self, data):
+        """One row of the fairness table per (target, sensitive attribute) pair."""
+        fmt = lambda v: f"{v:.4f}" if v is not None else "-"
+        values = [
+            latin1(data['target'])[:22], latin1(data['sensitive'])[:19], fmt(data['dp_real']),
+            fmt(data['dp_gen']), fmt(data['dp_gap']), fmt(data['eo_gap']), latin1(data['worst_group'] or "-")[:14]
+        ]
+        self.add_row(values, FAIRNESS_COLUMNS)
+
+    def add_row(self, values, columns):
+        """Table row: the first column is left-aligned, the others centered."""
+        for i, (value, (_, width)) in enumerate(zip(values, columns)):
+            self.cell(width, 6, value, 1, 0, 'L' if i == 0 else 'C')
+        self.ln()
+
+def generate_pdf_bytes(targets_data, summary=None):
     """
     Generates the final PDF report as bytes for download.
-    'targets_data' should be a list of dicts with metrics.
+    'targets_data' is an iterable of dicts with metrics (name, bias, status, entropy,
+    skewness and optionally p_value); it is consumed row by row, so a generator works.
+    'summary' optionally carries the global score, fairness gap, fairness matrix rows
+    and reference column of the audit.
     """
     pdf = BiasReport()
+    pdf.set_auto_page_break(True, margin=15)
     pdf.add_page()
     
     # Summary Section
@@ -32,12 +92,42 @@ def generate_pdf_bytes(targets_data):
     pdf.cell(0, 10, "1. Executive Summary", ln=True)
     pdf.set_font('Arial', '', 10)
     pdf.multi_cell(0, 5, "This report evaluates the statistical fidelity and fairness of synthetic datasets.")
+    pdf.cell(0, 6, f"Report date: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M')}", ln=True)
+    if summary:
+        if summary.get('global_score') is not None:
+            pdf.cell(0, 6, f"Global Fidelity Score: {summary['global_score']}%", ln=True)
+        if summary.get('reference'):
+            pdf.cell(0, 6, latin1(f"Reference column: {summary['reference']}"), ln=True)
+        gap = summary.get('fairness_gap')
+        pdf.cell(0, 6, f"Fairness Gap (mean demographic parity gap, generated vs real): {gap:.4f}"
+                 if gap is not None else "Fairness Gap: no sensitive attribute found", ln=True)
     pdf.ln(10)
 
+    # Metrics Section
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, "2. Per-Variable Metrics", ln=True)
+    pdf.add_table_header()
+    pdf.table_columns = METRIC_COLUMNS
     for data in targets_data:
-        pdf.add_metric_card(
-            data['name'], data['bias'], data['status'], 
-            data['entropy'], data['skewness']
-        )
+        pdf.add_metric_row(data)
+    pdf.table_columns = None
+
+    # Fairness Section: the pairs whose parity drifts most between real and generated data
+    fairness = (summary or {}).get('fairness') or []
+    if fairness:
+        worst = sorted(fairness, key=lambda r: -1 if r['dp_gap'] is None else r['dp_gap'], reverse=True)
+        pdf.ln(8)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 10, f"3. Fairness Matrix ({min(len(worst), FAIRNESS_ROWS_REPORTED)} of {len(worst)} pairs, "
+                        f"largest parity gap first)", ln=True)
+        label = worst[0].get('label')
+        pdf.set_font('Arial', '', 10)
+        pdf.cell(0, 6, latin1(f"Equalized odds conditioned on the outcome column: {label}") if label
+                 else "No outcome column found: equalized odds not computed", ln=True)
+        pdf.add_table_header(FAIRNESS_COLUMNS)
+        pdf.table_columns = FAIRNESS_COLUMNS
+        for data in worst[:FAIRNESS_ROWS_REPORTED]:
+            pdf.add_fairness_row(data)
+        pdf.table_columns = None
         
-    return pdf.output(dest='S').encode('latin-1')
\ No newline at end of file
+    return pdf.output(dest='S').encode('latin-1')
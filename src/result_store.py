@@ -0,0 +1,297 @@
+# src/result_store.py
+"""
+Persistent store of the finished audits (SQLite).
+
+An audit is addressed by the content hashes of its two datasets, its reference column, its
+column selection and its statistics method: auditing the same pair again, from the dashboard
+or the batch runner, returns the stored result instead of recomputing it. The stored audits
+also make up the audit history, and the successive generated datasets audited against one
+real dataset give the trend of its generator.
+
+Usage:
+    python -m src.result_store history [--real KEY] [--limit 50]
+    python -m src.result_store trend KEY
+    python -m src.result_store evict [--max-age-days 90] [--max-mb 256]
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from src.config import RESULT_STORE_PATH, RESULT_STORE_MAX_AGE_DAYS, RESULT_STORE_MAX_MB
+
+# Bumped whenever the audit formulas or the stored fields change: older results are ignored
+RESULT_FORMAT_VERSION = 2
+
+# Fields of an audit result kept in the store (the column metrics are in target order)
+STORED_FIELDS = ['reference', 'columns', 'fairness', 'fairness_gap', 'global_score']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    real_key TEXT NOT NULL,
+    generated_key TEXT NOT NULL,
+    reference TEXT,
+    selected TEXT NOT NULL,
+    method TEXT NOT NULL,
+    global_score REAL,
+    fairness_gap REAL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audits_request ON audits (real_key, generated_key, selected, method, version);
+CREATE INDEX IF NOT EXISTS audits_last_used ON audits (last_used);
+CREATE TABLE IF NOT EXISTS datasets (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    seen REAL NOT NULL
+);
+"""
+
+HISTORY_COLUMNS = ['created', 'real', 'generated', 'reference', 'method', 'selected',
+                   'global_score', 'fairness_gap', 'key', 'real_key', 'generated_key']
+
+
+# --- KEYS ---
+
+def audit_method(approx=False, out_of_core=False):
+    """Statistics method of an audit: 'exact', 'approx' (sketches) or 'out_of_core'."""
+    return 'out_of_core' if out_of_core else ('approx' if approx else 'exact')
+
+
+def selection_key(selected):
+    """Canonical form of a column selection (order and duplicates do not matter)."""
+    return json.dumps(sorted(set(selected or ['none'])))
+
+
+def result_key(real_key, generated_key, reference, selected, method):
+    """Content address of an audit result."""
+    payload = json.dumps([RESULT_FORMAT_VERSION, real_key, generated_key, reference, selection_key(selected), method])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _json_default(value):
+    """numpy scalars left in a result (float32 metrics, int64 counts)."""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+# --- STORE ---
+
+class ResultStore:
+    """
+    Audits stored in one SQLite file, shared by the threads and processes of the server and of
+    the batch runner (WAL journal). Every call is a no-op when 'path' is empty, and a storage
+    error is reported without failing the audit.
+    """
+
+    def __init__(self, path=RESULT_STORE_PATH, max_age_days=RESULT_STORE_MAX_AGE_DAYS, max_mb=RESULT_STORE_MAX_MB):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_mb = max_mb
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connect(self):
+        with self._lock:
+            if not self._ready:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            if not self._ready:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                self._ready = True
+        return connection
+
+    def find(self, real_key, generated_key, selected, method):
+        """Stored result of an identical audit (see STORED_FIELDS), None if it was never run."""
+        if not self.enabled:
+            return None
+        try:
+            with closing(self._connect()) as db, db:
+                row = db.execute(
+                    "SELECT key, result FROM audits WHERE real_key = ? AND generated_key = ? AND selected = ? "
+                    "AND method = ? AND version = ? ORDER BY created DESC LIMIT 1",
+                    (real_key, generated_key, selection_key(selected), method, RESULT_FORMAT_VERSION)
+                ).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE audits SET last_used = ? WHERE key = ?", (time.time(), row['key']))
+            return json.loads(row['result'])
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"Result Store Read Error: {e}")
+            return None
+
+    def put(self, real_key, generated_key, selected, method, result):
+        """Stores a finished audit, then applies the eviction policy. Returns its key."""
+        if not self.enabled:
+            return None
+        key = result_key(real_key, generated_key, result.get('reference'), selected, method)
+        payload = json.dumps({f: result[f] for f in STORED_FIELDS if f in result}, default=_json_default)
+        now = time.time()
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute(
+                    "INSERT OR REPLACE INTO audits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, RESULT_FORMAT_VERSION, real_key, generated_key, result.get('reference'),
+                     selection_key(selected), method, result.get('global_score'), result.get('fairness_gap'),
+                     now, now, len(payload), payload)
+                )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result Store Write Error: {e}")
+            return None
+        self.evict()
+        return key
+
+    def name_dataset(self, key, name):
+        """Records the file name of a dataset, shown in the history instead of its hash."""
+        if not self.enabled or not key or not name:
+            return
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute(
+                    "INSERT INTO datasets VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET name = excluded.name, seen = excluded.seen",
+                    (key, str(name), time.time())
+                )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result Store Write Error: {e}")
+
+    def history(self, limit=100, real_key=None):
+        """Stored audits, most recent first (optionally those of one real dataset), as a DataFrame."""
+        if not self.enabled:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        query = (
+            "SELECT a.created, COALESCE(r.name, substr(a.real_key, 1, 12)) AS real, "
+            "COALESCE(g.name, substr(a.generated_key, 1, 12)) AS generated, a.reference, a.method, a.selected, "
+            "a.global_score, a.fairness_gap, a.key, a.real_key, a.generated_key "
+            "FROM audits a LEFT JOIN datasets r ON r.key = a.real_key LEFT JOIN datasets g ON g.key = a.generated_key "
+            "WHERE a.version = ?" + (" AND a.real_key = ?" if real_key else "") +
+            " ORDER BY a.created DESC LIMIT ?"
+        )
+        params = (RESULT_FORMAT_VERSION,) + ((real_key,) if real_key else ()) + (limit,)
+        try:
+            with closing(self._connect()) as db:
+                rows = [dict(row) for row in db.execute(query, params)]
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result Store Read Error: {e}")
+            rows = []
+        history = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+        history['created'] = pd.to_datetime(history['created'], unit='s').dt.strftime('%Y-%m-%d %H:%M')
+        return history
+
+    def trend(self, real_key):
+        """Scores of the generated datasets audited against one real dataset, oldest first."""
+        history = self.history(limit=-1, real_key=real_key)
+        return history[['created', 'generated', 'method', 'global_score', 'fairness_gap']].iloc[::-1].reset_index(drop=True)
+
+    def real_datasets(self):
+        """Real datasets having stored audits, as (key, name) pairs, most recently audited first."""
+        if not self.enabled:
+            return []
+        try:
+            with closing(self._connect()) as db:
+                return [tuple(row) for row in db.execute(
+                    "SELECT a.real_key, COALESCE(r.name, substr(a.real_key, 1, 12)) FROM audits a "
+                    "LEFT JOIN datasets r ON r.key = a.real_key WHERE a.version = ? "
+                    "GROUP BY a.real_key ORDER BY MAX(a.created) DESC", (RESULT_FORMAT_VERSION,)
+                )]
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result Store Read Error: {e}")
+            return []
+
+    def evict(self, max_age_days=None, max_mb=None):
+        """
+        Removes the audits not reused for 'max_age_days', then the least recently used ones
+        until the stored results fit in 'max_mb' (configured limits by default; 0 disables a limit).
+        Returns the number of audits removed.
+        """
+        if not self.enabled:
+            return 0
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        max_mb = self.max_mb if max_mb is None else max_mb
+        removed = 0
+        try:
+            with closing(self._connect()) as db, db:
+                if max_age_days:
+                    removed += db.execute(
+                        "DELETE FROM audits WHERE last_used < ?", (time.time() - max_age_days * 86400,)
+                    ).rowcount
+                if max_mb:
+                    removed += db.execute(
+                        "DELETE FROM audits WHERE key IN (SELECT key FROM ("
+                        "SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS kept FROM audits"
+                        ") WHERE kept > ?)", (max_mb * 1024 ** 2,)
+                    ).rowcount
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result Store Eviction Error: {e}")
+        return removed
+
+    def stats(self):
+        """Number of stored audits and total size (MB) of their results."""
+        if not self.enabled:
+            return {'audits': 0, 'mb': 0.0}
+        try:
+            with closing(self._connect()) as db:
+                count, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM audits").fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result Store Read Error: {e}")
+            return {'audits': 0, 'mb': 0.0}
+        return {'audits': count, 'mb': round(size / 1024 ** 2, 3)}
+
+
+# Shared store used by the audit jobs and the batch runner
+RESULT_STORE = ResultStore()
+
+
+# --- ENTRY POINT ---
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lists or evicts the stored audit results.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    trend = commands.add_parser('trend', help="Scores of the candidates audited against one real dataset, oldest first")
+    trend.add_argument('real', help="Content key of the real dataset")
+    history = commands.add_parser('history', help="Lists the stored audits, most recent first")
+    history.add_argument('--real', default=None, help="Content key of a real dataset")
+    history.add_argument('--limit', type=int, default=50)
+    evict = commands.add_parser('evict', help="Removes old audits, then the least recently used ones")
+    evict.add_argument('--max-age-days', type=int, default=None)
+    evict.add_argument('--max-mb', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not RESULT_STORE.enabled:
+        print("Result store disabled (BIAS_AUDITOR_RESULT_STORE / BIAS_AUDITOR_CACHE_DIR is empty).")
+        return
+    if args.command == 'history':
+        history = RESULT_STORE.history(limit=args.limit, real_key=args.real)
+        columns = ['created', 'real', 'generated', 'reference', 'method', 'global_score', 'fairness_gap']
+        print(history[columns].to_string(index=False) if len(history) else "No stored audit.")
+    elif args.command == 'trend':
+        trend = RESULT_STORE.trend(args.real)
+        print(trend.to_string(index=False) if len(trend) else "No stored audit.")
+    else:
+        removed = RESULT_STORE.evict(args.max_age_days, args.max_mb)
+        stats = RESULT_STORE.stats()
+        print(f"{removed} audits removed, {stats['audits']} kept ({stats['mb']} MB) "
+              f"at {datetime.datetime.now().isoformat(timespec='seconds')}")
+
+
+if __name__ == '__main__':
+    main()
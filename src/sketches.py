@@ -0,0 +1,241 @@
+# src/sketches.py
+import numpy as np
+
+from src.config import SKETCH_SIZE, SKETCH_BINS
+
+
+# --- RUNNING STATISTICS ---
+
+class RunningStats:
+    """
+    Moments of a column updated batch by batch (Chan et al. / Pébay parallel formulas).
+    Gives count, missing values, mean, skewness, min and max in one pass.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        valid = values[~np.isnan(values)]
+        chunk = RunningStats()
+        chunk.missing = len(values) - len(valid)
+        if len(valid):
+            centered = valid - valid.mean()
+            chunk.count = len(valid)
+            chunk.mean = float(valid.mean())
+            chunk.m2 = float((centered ** 2).sum())
+            chunk.m3 = float((centered ** 3).sum())
+            chunk.min = float(valid.min())
+            chunk.max = float(valid.max())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Combines the statistics of another set of values into this one."""
+        self.missing += other.missing
+        if other.count == 0:
+            return self
+        n_a, n_b = self.count, other.count
+        total = n_a + n_b
+        delta = other.mean - self.mean
+        self.m3 += (other.m3 + delta ** 3 * n_a * n_b * (n_a - n_b) / total ** 2
+                    + 3 * delta * (n_a * other.m2 - n_b * self.m2) / total)
+        self.m2 += other.m2 + delta ** 2 * n_a * n_b / total
+        self.mean += delta * n_b / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def skewness(self):
+        """Biased sample skewness, as scipy.stats.skew."""
+        if self.count < 2 or self.m2 <= 0:
+            return 0.0
+        return float((self.m3 / self.count) / (self.m2 / self.count) ** 1.5)
+
+
+# --- QUANTILE SKETCH ---
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (KLL-style compactors).
+    Level h keeps at most 'k' items, each standing for 2**h values, so memory
+    stays around k * log2(n / k) items whatever the number of values n.
+    """
+
+    def __init__(self, k=SKETCH_SIZE, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._sorted = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Adds the values summarized by another sketch."""
+        self.count += other.count
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+        return self
+
+    def _compress(self):
+        # Halves every overfull level: one item in two (random offset) moves up with a doubled weight
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(0, 2)::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = keep
+            h += 1
+        self._sorted = None
+
+    def _weighted_items(self):
+        if self._sorted is None:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self.levels)])
+            order = np.argsort(items, kind='stable')
+            cumulative = np.cumsum(weights[order])
+            self._sorted = (items[order], cumulative / cumulative[-1] if len(cumulative) else cumulative)
+        return self._sorted
+
+    def cdf(self, x):
+        """Approximate fraction of values <= x."""
+        items, cumulative = self._weighted_items()
+        if len(items) == 0:
+            return np.zeros(np.shape(x))
+        pos = np.searchsorted(items, x, side='right')
+        return np.where(pos > 0, cumulative[np.clip(pos - 1, 0, None)], 0.0)
+
+    def quantile(self, q):
+        """Approximate value below which a fraction q of the values lies."""
+        items, cumulative = self._weighted_items()
+        if len(items) == 0:
+            return np.full(np.shape(q), np.nan)
+        return items[np.clip(np.searchsorted(cumulative, q, side='left'), 0, len(items) - 1)]
+
+    @property
+    def support(self):
+        """Values retained by the sketch (where its CDF changes)."""
+        return self._weighted_items()[0]
+
+
+# --- COLUMN SKETCH ---
+
+class ColumnSketch:
+    """
+    Bounded-memory summary of one numeric column, built once and reused:
+    moments (mean, skewness), exact counts of the first distinct values,
+    and a quantile sketch from which fixed-bin histograms and the KS distance derive.
+    """
+
+    def __init__(self, k=SKETCH_SIZE, bins=SKETCH_BINS):
+        self.bins = bins
+        self.moments = RunningStats()
+        self.quantiles = QuantileSketch(k)
+        # Exact counts while the column looks discrete (at most 'bins' distinct values)
+        self.value_counts = {}
+
+    @classmethod
+    def from_values(cls, values, k=SKETCH_SIZE, bins=SKETCH_BINS):
+        return cls(k, bins).update(values)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.moments.update(values)
+        self.quantiles.update(values)
+        if self.value_counts is not None:
+            uniques, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+            for value, count in zip(uniques.tolist(), counts.tolist()):
+                self.value_counts[value] = self.value_counts.get(value, 0) + count
+            if len(self.value_counts) > self.bins:
+                self.value_counts = None
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        if self.value_counts is not None and other.value_counts is not None:
+            for value, count in other.value_counts.items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + count
+            if len(self.value_counts) > self.bins:
+                self.value_counts = None
+        else:
+            self.value_counts = None
+        return self
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    @property
+    def mean(self):
+        return self.moments.mean
+
+    @property
+    def skewness(self):
+        return self.moments.skewness
+
+    def histogram(self):
+        """
+        Probabilities of the column values: exact for discrete columns,
+        otherwise 'bins' equal-width bins between the exact min and max.
+        """
+        if self.value_counts is not None:
+            counts = np.array(list(self.value_counts.values()), dtype=np.float64)
+            return counts / counts.sum() if counts.sum() else counts
+        edges = np.linspace(self.moments.min, self.moments.max, self.bins + 1)
+        cdf = self.quantiles.cdf(edges)
+        cdf[-1] = 1.0
+        return np.diff(np.concatenate([[0.0], cdf[1:]]))
+
+    def entropy(self):
+        """Shannon entropy (bits) of the histogram, as calculate_entropy."""
+        if self.count == 0:
+            return 0.0
+        prob = self.histogram()
+        return float(-1 * np.sum(prob * np.log2(prob + 1e-10)))
+
+
+# --- TWO-SAMPLE COMPARISON ---
+
+def sketch_ks_distance(a, b):
+    """Approximate two-sample Kolmogorov-Smirnov statistic between two column sketches."""
+    grid = np.union1d(a.quantiles.support, b.quantiles.support)
+    if len(grid) == 0:
+        return 0.0
+    return float(np.max(np.abs(a.quantiles.cdf(grid) - b.quantiles.cdf(grid))))
+
+
+def sketch_ks_2samp(a, b):
+    """(statistic, p-value) of the KS test, with the asymptotic distribution used by ks_2samp."""
+    d = sketch_ks_distance(a, b)
+    if a.count == 0 or b.count == 0:
+        return d, float('nan')
+    from scipy.stats import kstwo
+
+    m, n = sorted([float(a.count), float(b.count)], reverse=True)
+    return d, float(np.clip(kstwo.sf(d, np.round(m * n / (m + n))), 0, 1))
@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import skew
 
 # --- UI CONFIGURATIONS ---
 
@@ -27,6 +26,8 @@ def calculate_skewness(series):
     """
     if series.empty or series.nunique() <= 1:
         return 0.0
+    # scipy.stats is slow to import: loaded on first use, not with the app
+    from scipy.stats import skew
     return float(skew(series.dropna()))
 
 def calculate_entropy(series):
@@ -57,4 +58,9 @@ def calculate_global_score(mean_bias, p_value_avg, spd_score=None):
         # Default weighting without fairness metric
         final_score = (bias_fidelity * 0.6) + (stat_fidelity * 0.4)
         
-    return round(max(0, min(100, final_score)), 2)
\ No newline at end of file
+    return round(float(max(0, min(100, final_score))), 2)
+
+def get_bias_status(bias, thresholds=(15, 40)):
+    """Maps a bias percentage to its status label given the (vigilance, critical) thresholds."""
+    lim_v, lim_o = thresholds
+    return "OK" if bias <= lim_v else ("WARNING" if bias <= lim_o else "CRITIQUE")
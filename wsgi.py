@@ -0,0 +1,26 @@
+# wsgi.py
+"""
+Production entry point of the dashboard.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+The application and its heavy dependencies are imported once in the gunicorn master
+(preload_app) and shared copy-on-write by the forked workers. The workers share the
+parsed datasets and the audit jobs through SHARED_CACHE_DIR (see src.cache.SharedDirectory),
+so a poll or an export reaching any worker finds the audit started by another one.
+"""
+import importlib
+import os
+
+# Must be set before src.config is imported
+os.environ.setdefault("BIAS_AUDITOR_SHARED_CACHE", "1")
+
+# Modules only needed by some callbacks (statistics, charts, PDF), loaded up front
+PRELOADED_MODULES = ['scipy.stats', 'plotly.express', 'plotly.io', 'fpdf', 'src.reporting']
+
+for module in PRELOADED_MODULES:
+    importlib.import_module(module)
+
+from app import app  # noqa: E402
+
+server = app.server